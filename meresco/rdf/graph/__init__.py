@@ -30,7 +30,15 @@ from .uri import Uri, matchesIriSyntax
 from .bnode import BNode
 from .literal import Literal
 from .graph import Graph
+from .frozengraph import FrozenGraph
+from .overlaygraph import OverlayGraph
+from .concurrentgraph import ConcurrentGraph
+from .quadgraph import QuadGraph
+from .termdictionary import TermDictionary
+from .snapshot import writeSnapshot, openSnapshot, snapshotMetadata
 from .graphcomponent import GraphComponent
 from .rdfparser import RDFParser
+from .ntriples import NTriplesParser, loadNTriples, asNTriples
 from .triples2rdfxml import Triples2RdfXml
-from ._uris import LABEL_PREDICATES, PRIMARY_LABEL_PREDICATES
\ No newline at end of file
+from ._uris import LABEL_PREDICATES, PRIMARY_LABEL_PREDICATES
+from ._labels import LANGUAGE_PREFERENCE
\ No newline at end of file
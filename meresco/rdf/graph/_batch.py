@@ -0,0 +1,62 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from array import array
+
+from .bnode import BNode
+from .snapshot import _termKey, _termFromKey
+
+
+# Triples are passed between processes as the serialized keys of their terms plus an array of term ids.
+
+def encodeBatch(triples):
+    keys = {}
+    termIds = {}
+    ids = array('i')
+    for triple in triples:
+        for term in triple:
+            termId = termIds.get(term)
+            if termId is None:
+                key = _termKey(term)
+                termId = keys.get(key)
+                if termId is None:
+                    termId = keys[key] = len(keys)
+                termIds[term] = termId
+            ids.append(termId)
+    return sorted(keys, key=keys.get), ids
+
+def decodeBatch(keys, ids, bnodes, isLocal):
+    """
+    Decodes a batch; blank nodes for which isLocal(value) holds get new ids, consistently for all batches
+    that share the bnodes mapping.
+    """
+    terms = []
+    for key in keys:
+        kind, value = key[0], key[1:]
+        if kind in 'SB' and value.startswith('_:') and isLocal(value):
+            if value not in bnodes:
+                bnodes[value] = BNode().value.encode('utf-8')
+            key = kind + bnodes[value]
+        terms.append(_termFromKey(key))
+    return [(terms[ids[i]], terms[ids[i + 1]], terms[ids[i + 2]]) for i in xrange(0, len(ids), 3)]
@@ -0,0 +1,100 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from ._uris import LABEL_PREDICATES
+
+
+UNICODE_LABEL_PREDICATES = [unicode(p) for p in LABEL_PREDICATES]
+LANGUAGE_PREFERENCE = ('nl', 'en', None)
+_DEFAULT_PROFILE = tuple(UNICODE_LABEL_PREDICATES), LANGUAGE_PREFERENCE
+
+
+class LabelIndex(object):
+    """
+    Best label per subject for one profile: a list of label predicates and a language preference.
+    A label in a more preferred language wins, then a label of an earlier predicate; labels in
+    other languages are ignored.
+    """
+
+    def __init__(self, labelPredicates=UNICODE_LABEL_PREDICATES, languages=LANGUAGE_PREFERENCE):
+        self.labelPredicates = _firstOccurrences(labelPredicates)
+        self._predicateRanks = _ranks(self.labelPredicates)
+        self._languageRanks = _ranks(languages)
+        self._best = {}
+
+    def add(self, subject, predicate, object):
+        rank = self._rank(predicate, object)
+        if rank is None:
+            return
+        best = self._best.get(subject)
+        if best is None or rank < best[0]:
+            self._best[subject] = rank, object
+
+    def remove(self, subject, predicate, object, objects):
+        # objects(subject, predicate) returns the objects still in the graph
+        best = self._best.get(subject)
+        if best is None or best[1] != object or best[0] != self._rank(predicate, object):
+            return
+        del self._best[subject]
+        for p in self.labelPredicates:
+            for o in objects(subject, p):
+                self.add(subject, p, o)
+
+    def label(self, subject):
+        best = self._best.get(subject)
+        return None if best is None else best[1]
+
+    def bestLabel(self, subject, objects):
+        best = None
+        for p in self.labelPredicates:
+            for o in objects(subject, p):
+                rank = self._rank(p, o)
+                if rank is not None and (best is None or rank < best[0]):
+                    best = rank, o
+        return None if best is None else best[1]
+
+    def _rank(self, predicate, object):
+        predicateRank = self._predicateRanks.get(predicate)
+        if predicateRank is None or not object.isLiteral():
+            return None
+        languageRank = self._languageRanks.get(object.lang)
+        if languageRank is None:
+            return None
+        return languageRank, predicateRank, object.value
+
+
+def labelProfile(labelPredicates, languages):
+    if labelPredicates is UNICODE_LABEL_PREDICATES and languages is LANGUAGE_PREFERENCE:
+        return _DEFAULT_PROFILE
+    return tuple(unicode(p) for p in labelPredicates), tuple(languages)
+
+def _firstOccurrences(values):
+    seen = set()
+    return [v for v in values if not (v in seen or seen.add(v))]
+
+def _ranks(values):
+    ranks = {}
+    for rank, value in enumerate(values):
+        ranks.setdefault(value, rank)
+    return ranks
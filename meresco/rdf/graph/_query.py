@@ -0,0 +1,287 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from .uri import Uri
+from .bnode import BNode
+from ._utils import unique
+
+
+class TriplePattern(object):
+    def __init__(self, pattern):
+        if len(pattern) != 3:
+            raise ValueError("%s should have been a triple" % repr(pattern))
+        self.pattern = tuple(pattern)
+        self.variables = tuple(_variableName(value) for value in pattern)
+        self.constants = tuple(None if variable else value for value, variable in zip(pattern, self.variables))
+
+    def estimate(self, count, boundVariables, distinctCounts):
+        cardinality = float(count)
+        for position, variable in enumerate(self.variables):
+            if variable is not None and variable in boundVariables:
+                cardinality /= max(distinctCounts[position], 1)
+        return cardinality
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, repr(self.pattern))
+
+
+class QueryPlan(object):
+    """
+    Orders triple patterns by estimated cardinality (from the graph's index sizes), given the
+    variables already bound; patterns sharing a variable with earlier ones are preferred over
+    cartesian products. Without a graph the patterns are evaluated in the given order.
+
+    empty is True when a pattern matches no triple at all (by its constants only), so the
+    query has no results on the graph it was planned for.
+    """
+
+    def __init__(self, graph, patterns, boundVariables=()):
+        self.patterns = patterns
+        self.boundVariables = frozenset(boundVariables)
+        self.empty = False
+        self.steps = self._plan(graph)
+        self._compile()
+
+    def explain(self):
+        return [(step.pattern.pattern, step.estimate) for step in self.steps]
+
+    def evaluate(self, graph, bindings=None, distinct=True):
+        bindings = bindings or {}
+        results = (self._output(row) for row in self._evaluate(graph.iterTriples, 0, dict(bindings)))
+        if distinct:
+            results = unique(results, key=lambda d: tuple(sorted(d.items())))
+        return results
+
+    def evaluateBulk(self, graph, bindings=None, distinct=True):
+        # Set-at-a-time evaluation: intermediate results are kept as columns (one list of values
+        # per variable) and each pattern is hash joined on the variables bound so far.
+        bindings = bindings or {}
+        columns = dict((variable, [value]) for variable, value in bindings.items())
+        size = 1
+        for step in self.steps:
+            columns, size = step.join(graph.iterTriples, columns, size)
+            if not size:
+                return iter([])
+        outputColumns = []
+        for variable, convert in self._outputs:
+            column = columns[variable]
+            outputColumns.append(column if convert is None else _convertColumn(convert, column))
+        rows = zip(*outputColumns) if outputColumns else [()] * size
+        if distinct:
+            rows = unique(rows)
+        variables = [variable for variable, _ in self._outputs]
+        return (dict(zip(variables, row)) for row in rows)
+
+    def _plan(self, graph):
+        if graph is None:
+            return [_PlanStep(pattern, None) for pattern in self.patterns]
+        counts = [graph.count(*pattern.constants) for pattern in self.patterns]
+        if 0 in counts:
+            self.empty = True
+        distinctCounts = graph.distinctCounts()
+        bound = set(self.boundVariables)
+        remaining = range(len(self.patterns))
+        steps = []
+        while remaining:
+            def cost(index):
+                pattern = self.patterns[index]
+                connected = not bound or any(v in bound for v in pattern.variables if v is not None)
+                return (not connected, pattern.estimate(counts[index], bound, distinctCounts), index)
+            _, estimate, best = min(cost(index) for index in remaining)
+            remaining.remove(best)
+            steps.append(_PlanStep(self.patterns[best], estimate))
+            bound.update(v for v in self.patterns[best].variables if v is not None)
+        return steps
+
+    def _compile(self):
+        firstBoundAsObject = dict((v, True) for v in self.boundVariables)
+        for step in self.steps:
+            step.compile(firstBoundAsObject)
+        self._outputs = []
+        originalFirstAsObject = dict((v, True) for v in self.boundVariables)
+        for pattern in self.patterns:
+            for position, variable in enumerate(pattern.variables):
+                if variable is not None and variable not in originalFirstAsObject:
+                    originalFirstAsObject[variable] = position == 2
+        for variable, asObject in originalFirstAsObject.items():
+            if not asObject:
+                convert = _asUri
+            elif firstBoundAsObject[variable]:
+                convert = None
+            else:
+                convert = _asObjectNode
+            self._outputs.append((variable, convert))
+
+    def _evaluate(self, iterTriples, stepIndex, bindings):
+        if stepIndex == len(self.steps):
+            yield bindings
+            return
+        step = self.steps[stepIndex]
+        for triple in iterTriples(*step.mask(bindings)):
+            newBindings = step.bind(triple, bindings)
+            if newBindings is None:
+                continue
+            for result in self._evaluate(iterTriples, stepIndex + 1, newBindings):
+                yield result
+
+    def _output(self, bindings):
+        return dict((variable, bindings[variable] if convert is None else convert(bindings[variable])) for variable, convert in self._outputs)
+
+
+class PreparedQuery(object):
+    """
+    Triple patterns parsed once, to be matched many times with different initial bindings.
+
+    A plan is cached per set of initially bound variables; it is made again when the graph
+    has since grown or shrunk by more than a factor 2.
+    """
+
+    def __init__(self, graph, triplePatterns):
+        self._graph = graph
+        self._patterns = parsePatterns(triplePatterns)
+        self._plans = {}
+
+    def match(self, bindings=None, bulk=False, distinct=True):
+        graph = self._currentGraph()
+        bindings = bindings or {}
+        plan = self._plan(graph, frozenset(bindings))
+        evaluate = plan.evaluateBulk if bulk else plan.evaluate
+        return evaluate(graph, bindings=bindings, distinct=distinct)
+
+    def explain(self, boundVariables=()):
+        return self._plan(self._currentGraph(), frozenset(boundVariables)).explain()
+
+    def _currentGraph(self):
+        return self._graph
+
+    def _plan(self, graph, boundVariables):
+        size = graph.count()
+        try:
+            plannedSize, plan = self._plans[boundVariables]
+            if plannedSize // 2 <= size <= plannedSize * 2:
+                return plan
+        except KeyError:
+            pass
+        plan = QueryPlan(graph, self._patterns, boundVariables=boundVariables)
+        self._plans[boundVariables] = (size, plan)
+        return plan
+
+
+class _PlanStep(object):
+    def __init__(self, pattern, estimate):
+        self.pattern = pattern
+        self.estimate = estimate
+
+    def compile(self, firstBoundAsObject):
+        self._uses = []
+        self._binds = []
+        self._checks = []
+        for position, variable in enumerate(self.pattern.variables):
+            if variable is None:
+                continue
+            if variable in firstBoundAsObject:
+                if any(v == variable for _, v in self._binds):
+                    self._checks.append((position, variable))
+                    continue
+                if position < 2:
+                    convert = _asSubject
+                else:
+                    convert = None if firstBoundAsObject[variable] else _asObjectNode
+                self._uses.append((position, variable, convert))
+            else:
+                firstBoundAsObject[variable] = position == 2
+                self._binds.append((position, variable))
+        self._bindPosition = dict((variable, position) for position, variable in self._binds)
+
+    def mask(self, bindings):
+        mask = list(self.pattern.constants)
+        for position, variable, convert in self._uses:
+            value = bindings[variable]
+            mask[position] = value if convert is None else convert(value)
+        return mask
+
+    def join(self, iterTriples, columns, size):
+        groups = {}
+        for row in xrange(size):
+            key = tuple(columns[variable][row] for _, variable, _ in self._uses)
+            try:
+                groups[key].append(row)
+            except KeyError:
+                groups[key] = [row]
+        rows = []
+        newColumns = dict((variable, []) for _, variable in self._binds)
+        for key, keyRows in groups.iteritems():
+            mask = list(self.pattern.constants)
+            for (position, _, convert), value in zip(self._uses, key):
+                mask[position] = value if convert is None else convert(value)
+            for triple in iterTriples(*mask):
+                if any(_asSubject(triple[position]) != _asSubject(triple[self._bindPosition[variable]]) for position, variable in self._checks):
+                    continue
+                rows.extend(keyRows)
+                for position, variable in self._binds:
+                    newColumns[variable].extend([triple[position]] * len(keyRows))
+        for variable, column in columns.items():
+            newColumns[variable] = [column[row] for row in rows]
+        return newColumns, len(rows)
+
+    def bind(self, triple, bindings):
+        if not self._binds:
+            return bindings
+        newBindings = dict(bindings)
+        for position, variable in self._binds:
+            newBindings[variable] = triple[position]
+        for position, variable in self._checks:
+            if _asSubject(newBindings[variable]) != _asSubject(triple[position]):
+                return None
+        return newBindings
+
+
+def _convertColumn(convert, column):
+    converted = {}
+    result = []
+    for value in column:
+        try:
+            result.append(converted[value])
+        except KeyError:
+            result.append(converted.setdefault(value, convert(value)))
+    return result
+
+def parsePatterns(triplePatterns):
+    return [TriplePattern(pattern) for pattern in triplePatterns]
+
+def _variableName(value):
+    try:
+        isVariable = value.startswith('?')
+    except AttributeError:
+        isVariable = False
+    return value[1:] if isVariable else None
+
+def _asSubject(value):
+    return getattr(value, 'value', value)
+
+def _asUri(value):
+    return Uri(_asSubject(value))
+
+def _asObjectNode(value):
+    return BNode(value) if value.startswith('_:') else Uri(value)
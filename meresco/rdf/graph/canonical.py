@@ -0,0 +1,236 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from collections import defaultdict
+from hashlib import sha1
+
+from .bnode import BNode
+from .snapshot import _termKey
+
+
+def canonicalBNodeLabels(graph):
+    """
+    Maps the blank nodes of graph to labels that do not depend on the original labels.
+
+    Blank nodes are coloured by iteratively hashing their outgoing relations (so unchanged nested
+    structures keep their label when other parts of a graph change); blank nodes that are still tied
+    are told apart by their incoming relations and, if needed, by picking one of them (or all of them
+    at once when their blank node neighbours are already told apart). That choice is only canonical if
+    the tied nodes are interchangeable (automorphic), which covers the usual case of identical
+    descriptions; otherwise isomorphic graphs may get different labels, never the other way around.
+    """
+    return _canonicalLabels(*_bnodeRelations(graph))
+
+def canonicalTriples(graph, labels=None):
+    labels = canonicalBNodeLabels(graph) if labels is None else labels
+    for triple in graph.iterTriples():
+        yield _relabel(triple, labels)
+
+def canonicalDigest(graph):
+    """Digest (hex) of the triples of graph, equal for graphs that differ only in blank node labels."""
+    lines = sorted('%s %s %s\n' % tuple(_termKey(term) for term in triple) for triple in canonicalTriples(graph))
+    digest = sha1()
+    for line in lines:
+        digest.update(line)
+    return digest.hexdigest()
+
+def diffGraphs(graph, other):
+    """
+    Returns (additions, removals): the triples to add to and remove from graph to obtain other.
+
+    Triples without blank nodes are checked against the indexes of the other graph. Blank nodes are
+    paired by their content (outgoing relations), then by their incoming relations, and only then by
+    canonical label, so unchanged blank node structures do not show up in the diff, also when they
+    have identical twins. Added triples refer to paired blank nodes by their label in graph and to new
+    blank nodes by their canonical label in other.
+    """
+    pairs = _pairBNodes(graph, other)
+    otherBNodeTriples = set(triple for triple in other.iterTriples() if _hasBNode(triple))
+    removals = []
+    bnodeTriples = set()
+    for triple in graph.iterTriples():
+        if _hasBNode(triple):
+            bnodeTriples.add(triple)
+            if _translate(triple, pairs) not in otherBNodeTriples:
+                removals.append(triple)
+        elif other.count(*triple) == 0:
+            removals.append(triple)
+    inverse = dict((otherBNode, bnode) for bnode, otherBNode in pairs.items())
+    newLabels = None
+    additions = []
+    for triple in other.iterTriples():
+        if _hasBNode(triple):
+            if _translate(triple, inverse) not in bnodeTriples:
+                if newLabels is None:
+                    newLabels = dict(canonicalBNodeLabels(other), **inverse)
+                additions.append(_relabel(triple, newLabels))
+        elif graph.count(*triple) == 0:
+            additions.append(triple)
+    return additions, removals
+
+
+def _pairBNodes(graph, other):
+    groups = defaultdict(lambda: ([], []))
+    for side, g in enumerate([graph, other]):
+        outgoing, incoming = _bnodeRelations(g)
+        colours = _colourByContent(outgoing)
+        labels = _canonicalLabels(outgoing, incoming, colours=colours)
+        for bnode, colour in colours.items():
+            neighbourhood = _hash(_signatures(1, incoming.get(bnode, ()), colours))
+            groups[colour][side].append((neighbourhood, labels[bnode], bnode))
+    pairs = {}
+    for nodes, otherNodes in groups.values():
+        for key in [lambda node: node[0], lambda node: node[1], lambda node: None]:
+            if not (nodes and otherNodes):
+                break
+            candidates = defaultdict(list)
+            for node in sorted(otherNodes, reverse=True):
+                candidates[key(node)].append(node)
+            unpaired = []
+            for node in sorted(nodes):
+                matching = candidates.get(key(node))
+                if matching:
+                    pairs[node[2]] = matching.pop()[2]
+                else:
+                    unpaired.append(node)
+            nodes, otherNodes = unpaired, [node for matching in candidates.values() for node in matching]
+    return pairs
+
+def _translate((s, p, o), bnodes):
+    # None when a blank node has no counterpart
+    if s.startswith('_:'):
+        s = bnodes.get(s)
+        if s is None:
+            return None
+    if o.isBNode():
+        value = bnodes.get(o.value)
+        if value is None:
+            return None
+        o = BNode(value)
+    return s, p, o
+
+def _hasBNode((s, p, o)):
+    return s.startswith('_:') or o.isBNode()
+
+def _relabel((s, p, o), labels):
+    if s.startswith('_:'):
+        s = labels[s]
+    if o.isBNode():
+        o = BNode(labels[o.value])
+    return s, p, o
+
+def _bnodeRelations(graph):
+    outgoing = defaultdict(list)
+    incoming = defaultdict(list)
+    for s, p, o in graph.iterTriples():
+        sIsBNode, oIsBNode = s.startswith('_:'), o.isBNode()
+        if sIsBNode:
+            outgoing[s].append((_termKey(p), o.value if oIsBNode else None, None if oIsBNode else _termKey(o)))
+        if oIsBNode:
+            outgoing.setdefault(o.value, [])
+            incoming[o.value].append((_termKey(p), s if sIsBNode else None, None if sIsBNode else _termKey(s)))
+    return outgoing, incoming
+
+def _canonicalLabels(outgoing, incoming, colours=None):
+    colours = _colourByContent(outgoing) if colours is None else dict(colours)
+    ties = _ties(colours)
+    individualized = 0
+    while ties:
+        colours = _refine([bnode for _, _, bnode in ties], colours,
+            lambda bnode, colours: [colours[bnode]] + _signatures(0, outgoing[bnode], colours) + _signatures(1, incoming.get(bnode, ()), colours))
+        remaining = _ties(colours)
+        if len(remaining) == len(ties):
+            _, colour, _ = remaining[0]
+            tied = [bnode for _, tiedColour, bnode in remaining if tiedColour == colour]
+            if not _interchangeable(tied, colours, outgoing, incoming):
+                tied = tied[:1]
+            for bnode in tied:
+                individualized += 1
+                colours[bnode] = _hash([colour, '*%s' % individualized])
+            remaining = _ties(colours)
+        ties = remaining
+    return dict((bnode, '_:c' + colour[:20]) for bnode, colour in colours.items())
+
+def _colourByContent(outgoing):
+    # blank nodes that reach no cycle are coloured leaves first, by a hash of what is reachable from
+    # them (so unchanged nested structures keep their colour when other parts of a graph change)
+    parents = defaultdict(set)
+    pending = {}
+    for bnode, relations in outgoing.items():
+        children = set(other for _, other, _ in relations if other is not None)
+        pending[bnode] = len(children)
+        for child in children:
+            parents[child].add(bnode)
+    colours = {}
+    resolved = [bnode for bnode, count in pending.items() if count == 0]
+    while resolved:
+        bnode = resolved.pop()
+        colours[bnode] = _hash(_signatures(0, outgoing[bnode], colours))
+        for parent in parents.get(bnode, ()):
+            pending[parent] -= 1
+            if pending[parent] == 0:
+                resolved.append(parent)
+    cyclic = [bnode for bnode in outgoing if bnode not in colours]
+    if cyclic:
+        colours.update(dict.fromkeys(cyclic, ''))
+        colours = _refine(cyclic, colours, lambda bnode, colours: _signatures(0, outgoing[bnode], colours))
+    return colours
+
+def _refine(bnodes, colours, signatures):
+    # recolours bnodes by a hash of their signatures until the number of colours stops growing; from
+    # then on the partition is stable, so more passes would only rename colours
+    partitionSize = len(set(colours.values()))
+    while True:
+        newColours = dict(colours)
+        for bnode in bnodes:
+            newColours[bnode] = _hash(signatures(bnode, colours))
+        newPartitionSize = len(set(newColours.values()))
+        if newPartitionSize == partitionSize:
+            return newColours
+        colours, partitionSize = newColours, newPartitionSize
+
+def _interchangeable(tied, colours, outgoing, incoming):
+    # tied blank nodes whose blank node neighbours all have a colour of their own have identical
+    # relations to the same nodes, so they can be individualized at once in any order
+    counts = defaultdict(int)
+    for colour in colours.values():
+        counts[colour] += 1
+    for bnode in tied:
+        for relations in [outgoing[bnode], incoming.get(bnode, ())]:
+            for _, other, _ in relations:
+                if other is not None and counts[colours[other]] > 1:
+                    return False
+    return True
+
+def _signatures(direction, relations, colours):
+    return sorted('%s %s %s' % (direction, p, key if other is None else colours[other]) for p, other, key in relations)
+
+def _ties(colours):
+    counts = defaultdict(int)
+    for colour in colours.values():
+        counts[colour] += 1
+    return sorted((counts[colour], colour, bnode) for bnode, colour in colours.items() if counts[colour] > 1)
+
+def _hash(parts):
+    return sha1('\n'.join(parts)).hexdigest()
@@ -0,0 +1,153 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from threading import Condition, Lock
+
+from .graph import Graph, _BulkLoader, unicodeOrNone
+from ._labels import labelProfile, UNICODE_LABEL_PREDICATES, LANGUAGE_PREFERENCE
+
+
+class ConcurrentGraph(Graph):
+    """
+    Graph that may be shared between threads: any number of readers run concurrently, writers
+    are serialized and exclude readers.
+
+    Reads are materialized while holding the read lock, so iterTriples() never raises because of
+    a concurrent modification. A bulk load indexes its triples in batches of writeBatchSize,
+    releasing the write lock in between, so readers are never held up for a whole load.
+    """
+
+    def __init__(self, namespaces=None, termDictionary=None, writeBatchSize=10000):
+        Graph.__init__(self, namespaces=namespaces, termDictionary=termDictionary)
+        self._lock = ReadWriteLock()
+        self._writeBatchSize = writeBatchSize
+
+    def addTriple(self, subject, predicate, object):
+        with self._lock.writing():
+            Graph.addTriple(self, subject, predicate, object)
+
+    def removeTriple(self, subject, predicate, object):
+        with self._lock.writing():
+            Graph.removeTriple(self, subject, predicate, object)
+
+    def bulkLoader(self):
+        # encoded per batch in _indexBatch, under the write lock
+        return _BulkLoader(self, encode=False)
+
+    def _indexBatch(self, triples):
+        encode = None if self._terms is None else self._terms.encodeTriple
+        for start in xrange(0, len(triples), self._writeBatchSize):
+            batch = triples[start:start + self._writeBatchSize]
+            with self._lock.writing():
+                if encode is not None:
+                    batch = [encode(*t) for t in batch]
+                Graph._indexBatch(self, batch)
+
+    def distinctCounts(self):
+        with self._lock.reading():
+            return Graph.distinctCounts(self)
+
+    def __contains__(self, triple):
+        with self._lock.reading():
+            return Graph.__contains__(self, triple)
+
+    def findLabels(self, uris, labelPredicates=UNICODE_LABEL_PREDICATES, languages=LANGUAGE_PREFERENCE):
+        label = self._labelIndex(labelPredicates, languages).label
+        with self._lock.reading():
+            return [label(unicodeOrNone(uri)) for uri in uris]
+
+    def _labelIndex(self, labelPredicates, languages):
+        index = self._labelIndexes.get(labelProfile(labelPredicates, languages))
+        if index is not None:
+            return index
+        with self._lock.writing():
+            return Graph._labelIndex(self, labelPredicates, languages)
+
+    def _count(self, subject, predicate, object):
+        with self._lock.reading():
+            return Graph._count(self, subject, predicate, object)
+
+    def _triples(self, subject, predicate, object):
+        with self._lock.reading():
+            return Graph._triples(self, subject, predicate, object)
+
+    def _iterTriples(self, subject, predicate, object):
+        return iter(self._triples(subject, predicate, object))
+
+
+class ReadWriteLock(object):
+    """Many readers or one writer; waiting writers go first, so readers cannot starve them."""
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._waitingWriters = 0
+        self._readingContext = _Held(self.acquireRead, self.releaseRead)
+        self._writingContext = _Held(self.acquireWrite, self.releaseWrite)
+
+    def acquireRead(self):
+        with self._condition:
+            while self._writer or self._waitingWriters:
+                self._condition.wait()
+            self._readers += 1
+
+    def releaseRead(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquireWrite(self):
+        with self._condition:
+            self._waitingWriters += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waitingWriters -= 1
+            self._writer = True
+
+    def releaseWrite(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    def reading(self):
+        return self._readingContext
+
+    def writing(self):
+        return self._writingContext
+
+
+class _Held(object):
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+
+    def __exit__(self, excType, excValue, traceback):
+        self._release()
@@ -0,0 +1,124 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from meresco.xml import namespaces as defaultNamespaces
+
+from .graph import _AbstractGraph
+from .termdictionary import TermDictionary, UNKNOWN_TERM
+
+
+class FrozenGraph(_AbstractGraph):
+    """
+    Immutable graph with the read API of Graph.
+
+    Triples are stored as term ids in three sorted permutations (SPO, POS and OSP), each as three
+    parallel columns; lookups are binary searches for the range of matching rows.
+    """
+
+    def __init__(self, terms, spo, pos, osp, distinctCounts=None, namespaces=None):
+        self._terms = terms
+        self._permutations = (spo, pos, osp)
+        self._size = len(spo[0])
+        self._distinctCounts = distinctCounts or tuple(_countRuns(permutation[0]) for permutation in self._permutations)
+        self._labelIndexes = {}
+        self.namespaces = namespaces or defaultNamespaces
+
+    @classmethod
+    def fromGraph(cls, graph):
+        terms = TermDictionary()
+        encode = terms.encode
+        triples = [(encode(s), encode(p), encode(o)) for s, p, o in graph.iterTriples()]
+        return cls.fromEncodedTriples(terms, triples, namespaces=graph.namespaces)
+
+    @classmethod
+    def fromEncodedTriples(cls, terms, triples, namespaces=None):
+        spo = _columns(sorted(triples))
+        pos = _columns(sorted([(p, o, s) for s, p, o in triples]))
+        osp = _columns(sorted([(o, s, p) for s, p, o in triples]))
+        return cls(terms, spo, pos, osp, namespaces=namespaces)
+
+    def distinctCounts(self):
+        return self._distinctCounts
+
+    def freeze(self):
+        return self
+
+    def _count(self, subject, predicate, object):
+        _, lo, hi = self._range(subject, predicate, object)
+        return hi - lo
+
+    def _iterTriples(self, subject, predicate, object):
+        permutation, lo, hi = self._range(subject, predicate, object)
+        first, second, third = self._permutations[permutation]
+        decode = self._terms.decode
+        if permutation == SPO:
+            return ((decode(first[i]), decode(second[i]), decode(third[i])) for i in xrange(lo, hi))
+        if permutation == POS:
+            return ((decode(third[i]), decode(first[i]), decode(second[i])) for i in xrange(lo, hi))
+        return ((decode(second[i]), decode(third[i]), decode(first[i])) for i in xrange(lo, hi))
+
+    def _range(self, subject, predicate, object):
+        subject, predicate, object = self._terms.lookupTriple(subject, predicate, object)
+        if UNKNOWN_TERM in (subject, predicate, object):
+            return SPO, 0, 0
+        if subject is not None:
+            if object is not None and predicate is None:
+                permutation, values = OSP, (object, subject)
+            else:
+                permutation, values = SPO, (subject, predicate, object)
+        elif predicate is not None:
+            permutation, values = POS, (predicate, object)
+        else:
+            permutation, values = OSP, (object,)
+        lo, hi = _range(self._permutations[permutation], values)
+        return permutation, lo, hi
+
+    def _triples(self, subject, predicate, object):
+        return list(self._iterTriples(subject, predicate, object))
+
+
+SPO, POS, OSP = range(3)
+
+def _range(columns, values):
+    lo, hi = 0, len(columns[0])
+    for column, value in zip(columns, values):
+        if value is None:
+            break
+        lo, hi = bisect_left(column, value, lo, hi), bisect_right(column, value, lo, hi)
+    return lo, hi
+
+def _columns(sortedTriples):
+    return tuple(array('i', (t[i] for t in sortedTriples)) for i in range(3))
+
+def _countRuns(sortedColumn):
+    runs = 0
+    previous = None
+    for value in sortedColumn:
+        if value != previous:
+            runs += 1
+            previous = value
+    return runs
@@ -25,119 +25,393 @@
 #
 ## end license ##
 
-from collections import defaultdict
+from gc import disable as gcdisable, enable as gcenable, isenabled as isgcenabled
 
-from weightless.core import compose
-
-from .uri import Uri
-from ._utils import unique
 from meresco.xml import namespaces as defaultNamespaces
-from ._uris import LABEL_PREDICATES
-
+from ._labels import LabelIndex, labelProfile, UNICODE_LABEL_PREDICATES, LANGUAGE_PREFERENCE
+from ._query import QueryPlan, PreparedQuery, parsePatterns
 
-UNICODE_LABEL_PREDICATES = [unicode(p) for p in LABEL_PREDICATES]
 
-class Graph(object):
-    def __init__(self, namespaces=None):
-        self._tripleDict = defaultdict(set)
-        self.namespaces = namespaces or defaultNamespaces
+class _AbstractGraph(object):
+    """
+    Read API shared by the graph implementations; subclasses provide _iterTriples, _count and
+    distinctCounts (with subject and predicate as unicode strings).
 
-    def addTriple(self, subject, predicate, object):
-        subject, predicate = unicodeOrNone(subject), unicodeOrNone(predicate)
-        t = (subject, predicate, object)
-        for s in [None, subject]:
-            for p in [None, predicate]:
-                for o in [None, object]:
-                    self._tripleDict[(s, p, o)].add(t)
-
-    def addTriples(self, iterable):
-        for s, p, o in iterable:
-            self.addTriple(s, p, o)
-
-    def removeTriple(self, subject, predicate, object):
-        subject, predicate = unicodeOrNone(subject), unicodeOrNone(predicate)
-        t = (subject, predicate, object)
-        for s in [None, subject]:
-            for p in [None, predicate]:
-                for o in [None, object]:
-                    tripleSet = self._tripleDict.get((s, p, o))
-                    if tripleSet is None:
-                        continue
-                    tripleSet.discard(t)
-                    if not tripleSet:
-                        del self._tripleDict[(s, p, o)]
+    Subclasses that set _labelIndexes to a dict answer findLabel(s) from a LabelIndex per profile,
+    which they keep up to date themselves (or never need to, when immutable).
+    """
+    _labelIndexes = None
 
     def triples(self, subject=None, predicate=None, object=None):
         return self._triples(subject=unicodeOrNone(subject), predicate=unicodeOrNone(predicate), object=object)
 
+    def iterTriples(self, subject=None, predicate=None, object=None):
+        # Lazy alternative to triples(); raises RuntimeError when the graph is modified during iteration.
+        return self._iterTriples(subject=unicodeOrNone(subject), predicate=unicodeOrNone(predicate), object=object)
+
+    def count(self, subject=None, predicate=None, object=None):
+        return self._count(subject=unicodeOrNone(subject), predicate=unicodeOrNone(predicate), object=object)
+
     def objects(self, subject, predicate=None, curie=None):
         # predicate or predicate-curie (Compact URIs) is required.
         subject, predicate = unicodeOrNone(subject), unicodeOrNone(predicate)
         if predicate is None and not curie is None:
             predicate = self.namespaces.curieToUri(curie)
-        return [o for s, p, o in self._triples(subject=subject, predicate=predicate, object=None)]
+        return [o for s, p, o in self._iterTriples(subject=subject, predicate=predicate, object=None)]
 
     def literalValue(self, *args, **kwargs):
         for node in self.objects(*args, **kwargs):
             if node.isLiteral() and node.value:
                 return node.value
 
-    def findLabel(self, uri, labelPredicates=UNICODE_LABEL_PREDICATES):
-        # uri *as string*
-        labels = {}
-        for p in labelPredicates:
-            for _, _, o in self._triples(subject=unicodeOrNone(uri), predicate=p, object=None):
-                language = o.lang
-                if language == 'nl':
-                    return o
-                if language not in labels:
-                    labels[language] = o
+    def findLabel(self, uri, labelPredicates=UNICODE_LABEL_PREDICATES, languages=LANGUAGE_PREFERENCE):
+        # uri *as string*; languages in order of preference, None for labels without language
+        return self.findLabels([uri], labelPredicates=labelPredicates, languages=languages)[0]
 
-        label = labels.get('en') or labels.get(None)
-        return label
+    def findLabels(self, uris, labelPredicates=UNICODE_LABEL_PREDICATES, languages=LANGUAGE_PREFERENCE):
+        if self._labelIndexes is None:
+            index = LabelIndex(labelPredicates, languages)
+            return [index.bestLabel(unicodeOrNone(uri), self._labelObjects) for uri in uris]
+        label = self._labelIndex(labelPredicates, languages).label
+        return [label(unicodeOrNone(uri)) for uri in uris]
 
     def __contains__(self, triple):
-        return triple in self._tripleDict
-
-    def matchTriplePatterns(self, *triplePatterns):
-        def matchRecursive(patterns, bindings):
-            if not patterns:
-                yield bindings
-                return
-            pattern, patternsTail = patterns[0], patterns[1:]
-            if len(pattern) != 3:
-                raise ValueError("%s should have been a triple" % repr(pattern))
-            tripleMask = list(pattern)
-            variables = {}
-            for i, value in enumerate(pattern):
-                try:
-                    isVariable = value.startswith('?')
-                except AttributeError:
-                    isVariable = False
-                if isVariable:
-                    variable = value[1:]
-                    variables[i] = variable
-                    binding = bindings.get(variable)
-                    tripleMask[i] = getattr(binding, 'value', binding) if i < 2 else binding
-            for triple in self.triples(*tripleMask):
-                newBindings = dict(bindings)
-                for i, value in enumerate(triple):
-                    variable = variables.get(i)
-                    if not variable is None:
-                        newBindings[variable] = Uri(value) if i < 2 else value
-                yield matchRecursive(patterns=patternsTail, bindings=newBindings)
-        return unique(
-            compose(matchRecursive(patterns=triplePatterns, bindings={})),
-            key=lambda d: tuple(sorted(d.items())))
+        subject, predicate, object = triple
+        for _ in self._iterTriples(subject=unicodeOrNone(subject), predicate=unicodeOrNone(predicate), object=object):
+            return True
+        return False
+
+    def matchTriplePatterns(self, *triplePatterns, **options):
+        # options: bulk=True evaluates with hash joins on whole binding tables, distinct=False skips deduplication
+        patterns = parsePatterns(triplePatterns)
+        plan = QueryPlan(self if len(patterns) > 1 else None, patterns)
+        if plan.empty:
+            return iter([])
+        evaluate = plan.evaluateBulk if options.get('bulk', False) else plan.evaluate
+        return evaluate(self, distinct=options.get('distinct', True))
+
+    def explain(self, *triplePatterns):
+        return QueryPlan(self, parsePatterns(triplePatterns)).explain()
+
+    def prepare(self, *triplePatterns):
+        return PreparedQuery(self, triplePatterns)
 
     def __iter__(self):
-        return self._triples()
+        return self.iterTriples()
+
+    def freeze(self):
+        from .frozengraph import FrozenGraph
+        return FrozenGraph.fromGraph(self)
+
+    def canonicalBNodeLabels(self):
+        from .canonical import canonicalBNodeLabels
+        return canonicalBNodeLabels(self)
+
+    def canonicalDigest(self):
+        from .canonical import canonicalDigest
+        return canonicalDigest(self)
+
+    def diff(self, other):
+        from .canonical import diffGraphs
+        return diffGraphs(self, other)
+
+    def _triples(self, subject, predicate, object):
+        return list(self._iterTriples(subject, predicate, object))
+
+    def _labelIndex(self, labelPredicates, languages):
+        profile = labelProfile(labelPredicates, languages)
+        index = self._labelIndexes.get(profile)
+        if index is None:
+            index = LabelIndex(*profile)
+            for predicate in index.labelPredicates:
+                for subject, _, object in self._labelTriples(predicate):
+                    index.add(subject, predicate, object)
+            self._labelIndexes[profile] = index
+        return index
+
+    def _labelTriples(self, predicate):
+        return self._iterTriples(None, predicate, None)
+
+    def _labelObjects(self, subject, predicate):
+        return [o for _, _, o in self._iterTriples(subject, predicate, None)]
+
+
+class Graph(_AbstractGraph):
+    def __init__(self, namespaces=None, termDictionary=None):
+        self._spo = {}
+        self._pos = {}
+        self._osp = {}
+        self._subjectCounts = {}
+        self._predicateCounts = {}
+        self._objectCounts = {}
+        self._size = 0
+        self._generation = 0
+        self._terms = termDictionary
+        self._labelIndexes = {}
+        self.namespaces = namespaces or defaultNamespaces
+
+    def addTriple(self, subject, predicate, object):
+        subject, predicate = unicodeOrNone(subject), unicodeOrNone(predicate)
+        triple = subject, predicate, object
+        if self._terms is not None:
+            subject, predicate, object = self._terms.encodeTriple(subject, predicate, object)
+        if _addToIndex(self._spo, subject, predicate, object):
+            _addToIndex(self._pos, predicate, object, subject)
+            _addToIndex(self._osp, object, subject, predicate)
+            _increment(self._subjectCounts, subject)
+            _increment(self._predicateCounts, predicate)
+            _increment(self._objectCounts, object)
+            self._size += 1
+            self._generation += 1
+            for index in self._labelIndexes.itervalues():
+                index.add(*triple)
+
+    def addTriples(self, iterable, deferIndexing=False):
+        if deferIndexing:
+            with self.bulkLoader() as loader:
+                loader.addTriples(iterable)
+            return
+        for s, p, o in iterable:
+            self.addTriple(s, p, o)
+
+    def bulkLoader(self):
+        return _BulkLoader(self)
+
+    def removeTriple(self, subject, predicate, object):
+        subject, predicate = unicodeOrNone(subject), unicodeOrNone(predicate)
+        triple = subject, predicate, object
+        if self._terms is not None:
+            subject, predicate, object = self._terms.lookupTriple(subject, predicate, object)
+        if _removeFromIndex(self._spo, subject, predicate, object):
+            _removeFromIndex(self._pos, predicate, object, subject)
+            _removeFromIndex(self._osp, object, subject, predicate)
+            _decrement(self._subjectCounts, subject)
+            _decrement(self._predicateCounts, predicate)
+            _decrement(self._objectCounts, object)
+            self._size -= 1
+            self._generation += 1
+            for index in self._labelIndexes.itervalues():
+                index.remove(*triple, objects=self._labelObjects)
+
+    def _indexBatch(self, triples):
+        added = _mergeIntoIndex(self._spo, triples)
+        if not added:
+            return
+        _mergeIntoIndex(self._pos, [(p, o, s) for s, p, o in added])
+        _mergeIntoIndex(self._osp, [(o, s, p) for s, p, o in added])
+        for counts, position in [(self._subjectCounts, 0), (self._predicateCounts, 1), (self._objectCounts, 2)]:
+            get = counts.get
+            for t in added:
+                term = t[position]
+                counts[term] = get(term, 0) + 1
+        self._size += len(added)
+        self._generation += 1
+        if self._labelIndexes:
+            decoded = added if self._terms is None else [self._terms.decodeTriple(t) for t in added]
+            for index in self._labelIndexes.itervalues():
+                for t in decoded:
+                    index.add(*t)
+
+    def _count(self, subject, predicate, object):
+        if self._terms is not None:
+            subject, predicate, object = self._terms.lookupTriple(subject, predicate, object)
+        if subject is not None:
+            if predicate is not None:
+                objects = self._spo.get(subject, _EMPTY).get(predicate, _EMPTY)
+                if object is not None:
+                    return 1 if object in objects else 0
+                return len(objects)
+            if object is not None:
+                return len(self._osp.get(object, _EMPTY).get(subject, _EMPTY))
+            return self._subjectCounts.get(subject, 0)
+        if predicate is not None:
+            if object is not None:
+                return len(self._pos.get(predicate, _EMPTY).get(object, _EMPTY))
+            return self._predicateCounts.get(predicate, 0)
+        if object is not None:
+            return self._objectCounts.get(object, 0)
+        return self._size
+
+    def distinctCounts(self):
+        return len(self._subjectCounts), len(self._predicateCounts), len(self._objectCounts)
+
+    def __contains__(self, triple):
+        if self._terms is not None:
+            triple = self._terms.lookupTriple(*triple)
+        for _ in self._iterIndexed(*triple):
+            return True
+        return False
 
     def _triples(self, subject, predicate, object):
-        return list(self._tripleDict.get((subject, predicate, object), []))
+        if self._terms is None:
+            return list(self._iterIndexed(subject, predicate, object))
+        return [self._terms.decodeTriple(t) for t in self._iterIndexed(*self._terms.lookupTriple(subject, predicate, object))]
+
+    def _iterTriples(self, subject, predicate, object):
+        if self._terms is not None:
+            subject, predicate, object = self._terms.lookupTriple(subject, predicate, object)
+        return self._iterGeneration(self._generation, self._iterIndexed(subject, predicate, object))
+
+    def _labelTriples(self, predicate):
+        # Graph's own lookups; subclasses may guard _triples with a lock already held here
+        return Graph._triples(self, None, predicate, None)
+
+    def _labelObjects(self, subject, predicate):
+        return [o for _, _, o in Graph._triples(self, subject, predicate, None)]
+
+    def _iterGeneration(self, generation, triples):
+        terms = self._terms
+        for triple in triples:
+            if generation != self._generation:
+                raise RuntimeError('Graph changed during iteration')
+            yield triple if terms is None else terms.decodeTriple(triple)
+
+    def _iterIndexed(self, subject, predicate, object):
+        if subject is not None:
+            if predicate is not None:
+                objects = self._spo.get(subject, _EMPTY).get(predicate, _EMPTY)
+                if object is not None:
+                    if object in objects:
+                        yield subject, predicate, object
+                    return
+                for o in objects:
+                    yield subject, predicate, o
+            elif object is not None:
+                for p in self._osp.get(object, _EMPTY).get(subject, _EMPTY):
+                    yield subject, p, object
+            else:
+                for p, objects in self._spo.get(subject, _EMPTY).iteritems():
+                    for o in objects:
+                        yield subject, p, o
+        elif predicate is not None:
+            if object is not None:
+                for s in self._pos.get(predicate, _EMPTY).get(object, _EMPTY):
+                    yield s, predicate, object
+            else:
+                for o, subjects in self._pos.get(predicate, _EMPTY).iteritems():
+                    for s in subjects:
+                        yield s, predicate, o
+        elif object is not None:
+            for s, predicates in self._osp.get(object, _EMPTY).iteritems():
+                for p in predicates:
+                    yield s, p, object
+        else:
+            for s, predicateObjects in self._spo.iteritems():
+                for p, objects in predicateObjects.iteritems():
+                    for o in objects:
+                        yield s, p, o
+
+
 
+class _BulkLoader(object):
+    """
+    Collects triples (e.g. as sink of an RDFParser) and indexes them into the graph in one pass
+    when leaving the with-block, or on flush().
 
+    The cyclic garbage collector is paused while loading; it would otherwise repeatedly traverse
+    the millions of index containers being allocated.
 
+    With encode=False the triples are passed to the graph unencoded, even if it has a TermDictionary.
+    """
+
+    def __init__(self, graph, encode=True):
+        self._graph = graph
+        self._encode = None if graph._terms is None or not encode else graph._terms.encodeTriple
+        self._triples = []
+        self._gcWasEnabled = False
+
+    def addTriple(self, subject, predicate, object):
+        t = (unicode(subject), unicode(predicate), object)
+        self._triples.append(t if self._encode is None else self._encode(*t))
+
+    def addTriples(self, iterable):
+        for s, p, o in iterable:
+            self.addTriple(s, p, o)
+
+    def flush(self):
+        triples, self._triples = self._triples, []
+        gcWasEnabled = isgcenabled()
+        gcdisable()
+        try:
+            self._graph._indexBatch(triples)
+        finally:
+            if gcWasEnabled:
+                gcenable()
+
+    def __enter__(self):
+        self._gcWasEnabled = isgcenabled()
+        gcdisable()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        try:
+            if excType is None:
+                self.flush()
+        finally:
+            if self._gcWasEnabled:
+                gcenable()
+
+
+def _addToIndex(index, first, second, third):
+    secondIndex = index.get(first)
+    if secondIndex is None:
+        index[first] = {second: set([third])}
+        return True
+    thirds = secondIndex.get(second)
+    if thirds is None:
+        secondIndex[second] = set([third])
+        return True
+    if third in thirds:
+        return False
+    thirds.add(third)
+    return True
+
+def _mergeIntoIndex(index, triples):
+    # Inlined _addToIndex for bulk loading; returns the triples that were not yet in index
+    added = []
+    append = added.append
+    get = index.get
+    for t in triples:
+        first, second, third = t
+        secondIndex = get(first)
+        if secondIndex is None:
+            index[first] = {second: set([third])}
+        else:
+            thirds = secondIndex.get(second)
+            if thirds is None:
+                secondIndex[second] = set([third])
+            elif third in thirds:
+                continue
+            else:
+                thirds.add(third)
+        append(t)
+    return added
+
+def _removeFromIndex(index, first, second, third):
+    secondIndex = index.get(first)
+    if secondIndex is None:
+        return False
+    thirds = secondIndex.get(second)
+    if thirds is None or not third in thirds:
+        return False
+    thirds.remove(third)
+    if not thirds:
+        del secondIndex[second]
+        if not secondIndex:
+            del index[first]
+    return True
+
+def _increment(counts, key):
+    counts[key] = counts.get(key, 0) + 1
+
+def _decrement(counts, key):
+    count = counts[key] - 1
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
 
 def unicodeOrNone(aString):
     return None if aString is None else unicode(aString)
+
+_EMPTY = {}
@@ -25,8 +25,13 @@
 #
 ## end license ##
 
-from os import walk
+from itertools import izip
+from json import dumps
+from multiprocessing import Pool
+from os import walk, stat
 from os.path import join, basename, isfile
+from threading import Thread, Lock
+from time import time
 
 from lxml.etree import XML
 
@@ -34,16 +39,136 @@ from weightless.core import compose
 from meresco.core import Observable
 
 from .graph import Graph
+from .quadgraph import QuadGraph
+from .bnode import BNode
 from .rdfparser import RDFParser
+from .ntriples import NTriplesParser, _ScopedBNodes
+from .snapshot import writeSnapshot, openSnapshot, snapshotMetadata
+from ._batch import encodeBatch, decodeBatch
+from ._query import PreparedQuery
 
 
 class GraphComponent(Observable):
-    def __init__(self, rdfSources, name=None):
+    def __init__(self, rdfSources, name=None, termDictionary=None, freeze=False, snapshotPath=None, parallelism=None, reloadable=False):
         Observable.__init__(self, name=name)
-        self._graph = Graph()
-        for context, contentType, data in iterRdfSources(rdfSources):
-            lxmlNode = XML(data)
-            RDFParser(sink=self._graph).parse(lxmlNode)
+        self._rdfSources = rdfSources = list(rdfSources)
+        if reloadable and (freeze or snapshotPath):
+            raise ValueError('reloadable cannot be combined with freeze or snapshotPath')
+        if snapshotPath and any(hasattr(rdfSource, 'asRdfXml') for rdfSource in rdfSources):
+            # the freshness of a snapshot is checked against the source files; objects have no such state
+            raise ValueError('snapshotPath requires rdfSources to be files or directories')
+        self._termDictionary = termDictionary
+        self._freeze = freeze
+        self._reloadable = reloadable
+        self._snapshotPath = snapshotPath
+        self._parallelism = parallelism or 1
+        self._reloadLock = Lock()
+        self._graph, self._sources = self._build()
+
+    def reload(self):
+        """
+        Reparses the sources that were added or changed (by mtime and size) since the last (re)load and
+        removes the triples of sources that were changed or removed. Each source is a context of the
+        graph ('file:' and its file name, as in iterRdfSources, or the context of an object with asRdfXml),
+        so triples that another source also contains are kept.
+
+        Only for a component created with reloadable=True; keeping the contexts costs memory and load
+        time. reloadInBackground() works for every component.
+        """
+        if self._sources is None:
+            raise RuntimeError('reload() requires reloadable=True; use reloadInBackground() instead')
+        with self._reloadLock:
+            self._reloadSources(self._graph, self._sources)
+
+    def reloadInBackground(self):
+        """
+        Builds a new graph from all sources in a separate thread and then swaps it in. Lookups keep
+        being answered by the current graph until then; the message graphReloaded reports the duration
+        and the number of triples, graphReloadFailed the error when the build fails (the current graph
+        is then kept). Both messages are sent from the reload thread, not from the thread that called
+        reloadInBackground, so observers must be thread-safe and must not use the reactor, which is not.
+        """
+        thread = Thread(target=self._rebuild)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def prepare(self, *triplePatterns):
+        # Not forwarded to the graph: the query has to follow the graph swapped in by a reload.
+        return _ComponentQuery(self, triplePatterns)
+
+    def _rebuild(self):
+        with self._reloadLock:
+            t0 = time()
+            try:
+                graph, sources = self._build()
+            except Exception, e:
+                self.do.graphReloadFailed(name=self.observable_name(), seconds=time() - t0, error=e)
+                return
+            previousGraph, self._graph, self._sources = self._graph, graph, sources
+        self.do.graphReloaded(
+                name=self.observable_name(),
+                seconds=time() - t0,
+                triples=graph.count(),
+                previousTriples=previousGraph.count())
+
+    def _build(self):
+        snapshotPath = self._snapshotPath
+        if snapshotPath:
+            # taken before parsing, so a source changed meanwhile makes the snapshot outdated
+            manifest = _sourceManifest(self._rdfSources)
+            if _snapshotIsCurrent(snapshotPath, manifest):
+                return openSnapshot(snapshotPath), None
+        if self._reloadable:
+            graph, sources = QuadGraph(termDictionary=self._termDictionary), {}
+            self._reloadSources(graph, sources)
+            return graph, sources
+        graph = Graph(termDictionary=self._termDictionary)
+        for _ in self._iterLoaded([source for source, _ in _iterRdfSourceStates(self._rdfSources)], lambda source: graph.bulkLoader()):
+            pass
+        if snapshotPath:
+            writeSnapshot(graph, snapshotPath, metadata=manifest)
+            return openSnapshot(snapshotPath), None
+        return (graph.freeze() if self._freeze else graph), None
+
+    def _reloadSources(self, graph, sources):
+        states = dict(_iterRdfSourceStates(self._rdfSources))
+        outdated = set(_sourceContext(source) for source in sources if source not in states or sources[source] != states[source])
+        # files with the same name in different directories share a context, so they are reloaded together
+        for source in [source for source in sources if _sourceContext(source) in outdated]:
+            del sources[source]
+        for context in outdated:
+            graph.removeContext(context)
+        changed = [source for source in states if source not in sources]
+        for source in self._iterLoaded(changed, lambda source: graph.bulkLoader(context=_sourceContext(source))):
+            sources[source] = states[source]
+
+    def _iterLoaded(self, sources, bulkLoader):
+        # Parses one source at a time straight into bulkLoader(source); yields each source once loaded
+        files = [source for source in sources if not hasattr(source, 'asRdfXml')]
+        if self._parallelism < 2 or len(files) < 2:
+            for source in sources:
+                with bulkLoader(source) as loader:
+                    self._parse(source, loader)
+                yield source
+            return
+        for source in sources:
+            if hasattr(source, 'asRdfXml'):
+                with bulkLoader(source) as loader:
+                    self._parse(source, loader)
+                yield source
+        pool = Pool(processes=self._parallelism)
+        try:
+            for source, batch in izip(files, pool.imap(_parseEncoded, files)):
+                with bulkLoader(source) as loader:
+                    loader.addTriples(_decodeBatch(batch))
+                yield source
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _parse(self, source, sink):
+        _parseRdfSource(source, sink)
 
     def makeGraph(self, lxmlNode=None):
         graph = Graph()
@@ -55,6 +180,11 @@ class GraphComponent(Observable):
         return getattr(self._graph, attr)
 
 
+class _ComponentQuery(PreparedQuery):
+    def _currentGraph(self):
+        return self._graph._graph
+
+
 def iterRdfSources(rdfSources):
     for rdfSource in rdfSources:
         if hasattr(rdfSource, 'asRdfXml'):
@@ -65,6 +195,68 @@ def iterRdfSources(rdfSources):
             for context, rdfFilePath in iterRdfDataFiles(rdfSource):
                 yield context, contentType(rdfFilePath), open(rdfFilePath).read()
 
+class _TripleCollector(object):
+    def __init__(self):
+        self.triples = set()
+
+    def addTriple(self, subject, predicate, object):
+        self.triples.add((subject, predicate, object))
+
+
+def _parseRdfSource(source, sink):
+    if hasattr(source, 'asRdfXml'):
+        for _, _, data in iterRdfSources([source]):
+            RDFParser(sink=sink).parse(XML(data))
+    elif contentType(source) == 'text/plain':
+        # blank node labels are local to their document
+        with open(source) as stream:
+            NTriplesParser(sink=_ScopedBNodes(sink, {})).parseStream(stream)
+    else:
+        with open(source) as stream:
+            RDFParser(sink=sink).parseStream(stream)
+
+def _parseEncoded(source):
+    firstGenId = BNode.nextGenId
+    collector = _TripleCollector()
+    _parseRdfSource(source, collector)
+    keys, ids = encodeBatch(collector.triples)
+    return keys, ids, (firstGenId, BNode.nextGenId)
+
+def _decodeBatch((keys, ids, (firstGenId, lastGenId))):
+    # blank nodes generated by the worker get new ids here, so they don't collide across workers
+    isGenerated = lambda value: value.startswith('_:id') and value[4:].isdigit() and firstGenId <= int(value[4:]) < lastGenId
+    return decodeBatch(keys, ids, bnodes={}, isLocal=isGenerated)
+
+def _sourceContext(source):
+    return source.context if hasattr(source, 'asRdfXml') else 'file:%s' % basename(source)
+
+def _iterRdfSourceStates(rdfSources):
+    for rdfSource in rdfSources:
+        if hasattr(rdfSource, 'asRdfXml'):
+            yield rdfSource, None
+        elif isfile(rdfSource):
+            yield rdfSource, _fileState(rdfSource)
+        else:
+            for _, rdfFilePath in iterRdfDataFiles(rdfSource):
+                yield rdfFilePath, _fileState(rdfFilePath)
+
+def _fileState(path):
+    st = stat(path)
+    return st.st_mtime, st.st_size
+
+def _sourceManifest(rdfSources):
+    # the configured sources and (path, mtime, size) of every file they contain
+    files = sorted([path, mtime, size] for path, (mtime, size) in _iterRdfSourceStates(rdfSources))
+    return dumps(dict(rdfSources=rdfSources, files=files), sort_keys=True)
+
+def _snapshotIsCurrent(snapshotPath, manifest):
+    if not isfile(snapshotPath):
+        return False
+    try:
+        return snapshotMetadata(snapshotPath) == manifest
+    except ValueError:
+        return False
+
 def contentType(filename):
     if filename.endswith('.rdf'):
         return 'text/xml'
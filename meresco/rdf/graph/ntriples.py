@@ -0,0 +1,225 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from multiprocessing import Pool
+from os.path import getsize
+from re import compile as regexCompile
+from time import time
+
+from .uri import Uri
+from .bnode import BNode
+from .literal import Literal
+from .graph import Graph
+from ._batch import encodeBatch, decodeBatch
+
+
+class NTriplesParser(object):
+    """Line based N-Triples parser; produces the same terms as RDFParser.
+
+Like RDFParser, datatypes of literals are ignored.
+"""
+
+    def __init__(self, sink=None):
+        self._sink = sink or Graph()
+        self.addTriple = self._sink.addTriple
+
+    def parseStream(self, stream):
+        for lineNumber, line in enumerate(stream, start=1):
+            self.parseLine(line, lineNumber=lineNumber)
+        return self._sink
+
+    def parseRange(self, stream, start, end):
+        """Parses the lines that start in the byte range [start, end) of a seekable stream."""
+        position = start
+        if start > 0:
+            stream.seek(start - 1)
+            if stream.read(1) != '\n':
+                position += len(stream.readline())
+        else:
+            stream.seek(0)
+        while position < end:
+            line = stream.readline()
+            if not line:
+                break
+            position += len(line)
+            self.parseLine(line)
+        return self._sink
+
+    def parseLine(self, line, lineNumber=None):
+        if isinstance(line, str):
+            line = line.decode('utf-8')
+        match = _TRIPLE.match(line)
+        if match is None:
+            if _EMPTY.match(line):
+                return
+            raise ValueError('Invalid N-Triples%s: %r' % ('' if lineNumber is None else ' at line %s' % lineNumber, line))
+        subjectUri, subjectBNode, predicate, objectUri, objectBNode, literal, lang = match.groups()
+        if objectUri is not None:
+            object = Uri(_unescape(objectUri))
+        elif objectBNode is not None:
+            object = BNode(objectBNode)
+        else:
+            object = Literal(_unescape(literal), lang=lang)
+        self.addTriple(subjectBNode or _unescape(subjectUri), _unescape(predicate), object)
+
+
+def loadNTriples(path, sink, processes=None, chunkSize=64 * 1024 * 1024):
+    """
+    Parses the N-Triples file at path in chunks of about chunkSize bytes (split at line boundaries) using
+    a pool of processes, and adds the triples to sink (e.g. a Graph, whose bulk loader is then used).
+    Blank node labels are scoped to the file: equal labels in different chunks are the same node, but
+    they get new ids so they don't collide with blank nodes from other files.
+
+    Returns statistics: the number of triples parsed, chunks, seconds and triplesPerSecond.
+    """
+    t0 = time()
+    size = getsize(path)
+    chunks = [(path, start, min(start + chunkSize, size)) for start in xrange(0, size, chunkSize)]
+    if hasattr(sink, 'bulkLoader'):
+        with sink.bulkLoader() as loader:
+            triples = _loadChunks(chunks, loader, processes)
+    else:
+        triples = _loadChunks(chunks, sink, processes)
+    seconds = time() - t0
+    return dict(triples=triples, chunks=len(chunks), seconds=seconds, triplesPerSecond=triples / seconds if seconds else 0.0)
+
+def _loadChunks(chunks, sink, processes):
+    bnodes = {}
+    if processes == 1 or len(chunks) < 2:
+        sink = _ScopedBNodes(sink, bnodes)
+        for path, start, end in chunks:
+            with open(path, 'rb') as stream:
+                NTriplesParser(sink=sink).parseRange(stream, start, end)
+        return sink.triples
+    triples = 0
+    pool = Pool(processes=processes)
+    try:
+        for keys, ids in pool.imap(_parseChunk, chunks):
+            for triple in decodeBatch(keys, ids, bnodes=bnodes, isLocal=_allBNodes):
+                sink.addTriple(*triple)
+                triples += 1
+    finally:
+        pool.terminate()
+        pool.join()
+    return triples
+
+def _parseChunk((path, start, end)):
+    collector = _TripleCollector()
+    with open(path, 'rb') as stream:
+        NTriplesParser(sink=collector).parseRange(stream, start, end)
+    return encodeBatch(collector.triples)
+
+def _allBNodes(value):
+    return True
+
+
+class _ScopedBNodes(object):
+    def __init__(self, sink, bnodes):
+        self._sink = sink
+        self._bnodes = bnodes
+        self.triples = 0
+
+    def addTriple(self, subject, predicate, object):
+        if subject.startswith('_:'):
+            subject = self._bnode(subject)
+        if object.isBNode():
+            object = BNode(self._bnode(object.value))
+        self._sink.addTriple(subject, predicate, object)
+        self.triples += 1
+
+    def _bnode(self, label):
+        value = self._bnodes.get(label)
+        if value is None:
+            value = self._bnodes[label] = BNode().value
+        return value
+
+
+class _TripleCollector(object):
+    def __init__(self):
+        self.triples = []
+
+    def addTriple(self, subject, predicate, object):
+        self.triples.append((subject, predicate, object))
+
+
+def asNTriples(triples, context=None, linesPerChunk=1000):
+    """
+    Serializes triples (a graph or any iterable of triples) as UTF-8 encoded N-Triples, yielding chunks
+    of at most linesPerChunk lines. With a context, or for items that are (subject, predicate, object,
+    context) quads, N-Quads lines are written.
+    """
+    lines = []
+    for item in triples:
+        subject, predicate, object = item[:3]
+        quadContext = item[3] if len(item) > 3 else context
+        line = u'%s <%s> %s' % (_subjectTerm(subject), _escapeIri(predicate), _objectTerm(object))
+        if quadContext is not None:
+            line += u' ' + _subjectTerm(quadContext.value if hasattr(quadContext, 'value') else quadContext)
+        lines.append(line + u' .\n')
+        if len(lines) >= linesPerChunk:
+            yield u''.join(lines).encode('utf-8')
+            lines = []
+    if lines:
+        yield u''.join(lines).encode('utf-8')
+
+def _subjectTerm(value):
+    if value.startswith('_:'):
+        return value
+    return u'<%s>' % _escapeIri(value)
+
+def _objectTerm(object):
+    if object.isUri():
+        return u'<%s>' % _escapeIri(object.value)
+    if object.isBNode():
+        return object.value
+    literal = u'"%s"' % _LITERAL_SPECIALS.sub(_escapeMatch, object.value or u'')
+    if object.lang:
+        literal += u'@' + object.lang
+    return literal
+
+def _escapeIri(value):
+    return _IRI_SPECIALS.sub(_escapeMatch, value)
+
+def _escapeMatch(match):
+    c = match.group(0)
+    return _ESCAPES.get(c) or u'\\u%04X' % ord(c)
+
+def _unescape(value):
+    if '\\' not in value:
+        return value
+    return _ESCAPE.sub(_unescapeMatch, value)
+
+def _unescapeMatch(match):
+    return match.group(0).encode('ascii').decode('unicode-escape')
+
+_IRI = r'<([^>]*)>'
+_BNODE = r'(_:[^\s<.]+(?:\.+[^\s<.]+)*)'
+_TRIPLE = regexCompile(
+    r'\s*(?:%(iri)s|%(bnode)s)\s*%(iri)s\s*(?:%(iri)s|%(bnode)s|"((?:[^"\\]|\\.)*)"(?:@([a-zA-Z]+(?:-[a-zA-Z0-9]+)*)|\^\^<[^>]*>)?)\s*\.\s*(?:#.*)?$' % dict(iri=_IRI, bnode=_BNODE),
+    )
+_EMPTY = regexCompile(r'\s*(?:#.*)?$')
+_LITERAL_SPECIALS = regexCompile(ur'[\\"\n\r]')
+_IRI_SPECIALS = regexCompile(ur'[\x00-\x20<>"{}|^`\\]')
+_ESCAPES = {u'\\': u'\\\\', u'"': u'\\"', u'\n': u'\\n', u'\r': u'\\r'}
+_ESCAPE = regexCompile(r'\\(?:u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|[tbnrf"\'\\])')
@@ -0,0 +1,101 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from itertools import chain
+
+from .graph import _AbstractGraph, Graph, unicodeOrNone
+
+
+class OverlayGraph(_AbstractGraph):
+    """
+    Graph that records additions and removals on top of a base graph (any graph with the read API)
+    without copying it; reads merge the delta with the base lazily. commit() applies the delta to a
+    mutable base. The base should not be modified directly while the overlay is in use.
+    """
+
+    def __init__(self, base):
+        self._base = base
+        self._added = Graph(namespaces=base.namespaces)
+        self._removed = set()
+        self.namespaces = base.namespaces
+
+    def addTriple(self, subject, predicate, object):
+        triple = (unicodeOrNone(subject), unicodeOrNone(predicate), object)
+        if triple in self._removed:
+            self._removed.remove(triple)
+        elif not self._inBase(triple):
+            self._added.addTriple(*triple)
+
+    def addTriples(self, iterable):
+        for s, p, o in iterable:
+            self.addTriple(s, p, o)
+
+    def removeTriple(self, subject, predicate, object):
+        triple = (unicodeOrNone(subject), unicodeOrNone(predicate), object)
+        if triple in self._added:
+            self._added.removeTriple(*triple)
+        elif self._inBase(triple):
+            self._removed.add(triple)
+
+    def commit(self):
+        if not hasattr(self._base, 'addTriple'):
+            raise RuntimeError('commit() requires a mutable base graph')
+        for triple in self._removed:
+            self._base.removeTriple(*triple)
+        added = self._added.triples()
+        if hasattr(self._base, 'bulkLoader'):
+            with self._base.bulkLoader() as loader:
+                loader.addTriples(added)
+        else:
+            for triple in added:
+                self._base.addTriple(*triple)
+        self._added = Graph(namespaces=self.namespaces)
+        self._removed = set()
+
+    def distinctCounts(self):
+        return tuple(max(base, added) for base, added in zip(self._base.distinctCounts(), self._added.distinctCounts()))
+
+    def __contains__(self, triple):
+        subject, predicate, object = triple
+        triple = (unicodeOrNone(subject), unicodeOrNone(predicate), object)
+        return triple in self._added or (triple not in self._removed and self._inBase(triple))
+
+    def _count(self, subject, predicate, object):
+        removed = sum(1 for triple in self._removed if _matches(triple, subject, predicate, object))
+        return self._base._count(subject, predicate, object) - removed + self._added._count(subject, predicate, object)
+
+    def _iterTriples(self, subject, predicate, object):
+        base = self._base._iterTriples(subject, predicate, object)
+        if self._removed:
+            removed = self._removed
+            base = (triple for triple in base if triple not in removed)
+        return chain(base, self._added._iterTriples(subject, predicate, object))
+
+    def _inBase(self, triple):
+        # count() instead of 'in': a base such as GraphComponent forwards attributes, not __contains__
+        return self._base.count(*triple) > 0
+
+
+def _matches((s, p, o), subject, predicate, object):
+    return (subject is None or s == subject) and (predicate is None or p == predicate) and (object is None or o == object)
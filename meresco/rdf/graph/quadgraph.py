@@ -0,0 +1,183 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from meresco.xml import namespaces as defaultNamespaces
+
+from .graph import _AbstractGraph, Graph, unicodeOrNone
+from ._labels import UNICODE_LABEL_PREDICATES, LANGUAGE_PREFERENCE
+
+
+_ALL = object()
+
+class QuadGraph(_AbstractGraph):
+    """
+    Triples in named contexts (named graphs).
+
+    The read API of Graph reads the union of all contexts; triples, count and quads take a context to
+    read only that context (None being the context of addTriple). Triples are reference counted per
+    context, so removeContext takes time proportional to the size of the removed context.
+    """
+
+    def __init__(self, namespaces=None, termDictionary=None):
+        self.namespaces = namespaces or defaultNamespaces
+        self._termDictionary = termDictionary
+        self._union = Graph(namespaces=self.namespaces, termDictionary=termDictionary)
+        self._contexts = {}
+        self._tripleCounts = {}
+
+    def addTriple(self, subject, predicate, object):
+        self.addQuad(subject, predicate, object, None)
+
+    def addQuad(self, subject, predicate, object, context):
+        triple = (unicodeOrNone(subject), unicodeOrNone(predicate), object)
+        contextGraph = self._contextGraph(context)
+        if triple in contextGraph:
+            return
+        contextGraph.addTriple(*triple)
+        count = self._tripleCounts.get(triple, 0)
+        if count == 0:
+            self._union.addTriple(*triple)
+        self._tripleCounts[triple] = count + 1
+
+    def addTriples(self, iterable, context=None):
+        contextGraph = self._contextGraph(context)
+        triples = set()
+        for s, p, o in iterable:
+            triple = (unicodeOrNone(s), unicodeOrNone(p), o)
+            if triple not in contextGraph:
+                triples.add(triple)
+        if not triples:
+            if contextGraph.count() == 0:
+                del self._contexts[context]
+            return
+        tripleCounts = self._tripleCounts
+        with contextGraph.bulkLoader() as contextLoader:
+            with self._union.bulkLoader() as unionLoader:
+                for triple in triples:
+                    contextLoader.addTriple(*triple)
+                    count = tripleCounts.get(triple, 0)
+                    if count == 0:
+                        unionLoader.addTriple(*triple)
+                    tripleCounts[triple] = count + 1
+
+    def bulkLoader(self, context=None):
+        return _QuadLoader(self, context)
+
+    def removeQuad(self, subject, predicate, object, context):
+        triple = (unicodeOrNone(subject), unicodeOrNone(predicate), object)
+        contextGraph = self._contexts.get(context)
+        if contextGraph is None or triple not in contextGraph:
+            return
+        contextGraph.removeTriple(*triple)
+        if contextGraph.count() == 0:
+            del self._contexts[context]
+        self._release(triple)
+
+    def removeTriple(self, subject, predicate, object):
+        for context in self.contexts():
+            self.removeQuad(subject, predicate, object, context)
+
+    def removeContext(self, context):
+        contextGraph = self._contexts.pop(context, None)
+        if contextGraph is None:
+            return
+        for triple in contextGraph.triples():
+            self._release(triple)
+
+    def contexts(self):
+        return list(self._contexts)
+
+    def triples(self, subject=None, predicate=None, object=None, context=_ALL):
+        if context is _ALL:
+            return _AbstractGraph.triples(self, subject, predicate, object)
+        contextGraph = self._contexts.get(context)
+        return [] if contextGraph is None else contextGraph.triples(subject, predicate, object)
+
+    def count(self, subject=None, predicate=None, object=None, context=_ALL):
+        if context is _ALL:
+            return _AbstractGraph.count(self, subject, predicate, object)
+        contextGraph = self._contexts.get(context)
+        return 0 if contextGraph is None else contextGraph.count(subject, predicate, object)
+
+    def quads(self, subject=None, predicate=None, object=None, context=_ALL):
+        contexts = self._contexts.items() if context is _ALL else [(context, self._contexts.get(context))]
+        for context, contextGraph in contexts:
+            if contextGraph is not None:
+                for s, p, o in contextGraph.iterTriples(subject, predicate, object):
+                    yield s, p, o, context
+
+    def distinctCounts(self):
+        return self._union.distinctCounts()
+
+    def __contains__(self, triple):
+        return triple in self._union
+
+    def findLabels(self, uris, labelPredicates=UNICODE_LABEL_PREDICATES, languages=LANGUAGE_PREFERENCE):
+        return self._union.findLabels(uris, labelPredicates=labelPredicates, languages=languages)
+
+    def _count(self, subject, predicate, object):
+        return self._union._count(subject, predicate, object)
+
+    def _iterTriples(self, subject, predicate, object):
+        return self._union._iterTriples(subject, predicate, object)
+
+    def _triples(self, subject, predicate, object):
+        return self._union._triples(subject, predicate, object)
+
+    def _contextGraph(self, context):
+        contextGraph = self._contexts.get(context)
+        if contextGraph is None:
+            contextGraph = self._contexts[context] = Graph(namespaces=self.namespaces, termDictionary=self._termDictionary)
+        return contextGraph
+
+    def _release(self, triple):
+        count = self._tripleCounts.pop(triple) - 1
+        if count == 0:
+            self._union.removeTriple(*triple)
+        else:
+            self._tripleCounts[triple] = count
+
+
+class _QuadLoader(object):
+    def __init__(self, graph, context):
+        self._graph = graph
+        self._context = context
+        self._triples = []
+
+    def addTriple(self, subject, predicate, object):
+        self._triples.append((subject, predicate, object))
+
+    def addTriples(self, iterable):
+        self._triples.extend(iterable)
+
+    def flush(self):
+        triples, self._triples = self._triples, []
+        self._graph.addTriples(triples, context=self._context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.flush()
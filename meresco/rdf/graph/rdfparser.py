@@ -28,7 +28,7 @@
 
 from urlparse import urljoin as urijoin
 
-from lxml.etree import Element
+from lxml.etree import Element, iterparse
 
 from meresco.xml.namespaces import curieToTag, curieToUri
 
@@ -72,6 +72,28 @@ How incorrect RDF/XML (or input with unsupported constructs) is parsed into a gr
             self.nodeElement(root)
         return self._sink
 
+    def parseStream(self, stream):
+        """
+        Parses RDF/XML from a file(-like object) with iterparse; each node element directly under
+        rdf:RDF is processed as soon as it has been read and is then removed from the tree, so memory
+        use is bounded by the largest node element rather than by the document.
+        """
+        depth = 0
+        for event, element in iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                if element.tag != rdf_RDF_tag:
+                    self.nodeElement(element)
+            elif depth == 1 and element.getparent().tag == rdf_RDF_tag:
+                self.nodeElement(element)
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+        return self._sink
+
     def bNode(self, nodeID=None):
         if not nodeID is None:
             if not nodeID[0].isalpha(): nodeID = 'b' + nodeID
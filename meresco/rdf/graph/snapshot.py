@@ -0,0 +1,225 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from bisect import bisect_left
+from mmap import mmap, ACCESS_READ
+from os import rename, remove, fsync, fchmod, fdopen
+from os.path import abspath, basename, dirname
+from tempfile import mkstemp
+from struct import Struct
+
+from .uri import Uri
+from .bnode import BNode
+from .literal import Literal
+from .frozengraph import FrozenGraph, _countRuns
+from .termdictionary import UNKNOWN_TERM
+
+
+MAGIC = 'MRDFSNP2'
+
+def writeSnapshot(graph, path, metadata=''):
+    """
+    Writes the triples of graph to path as a snapshot that can be opened (memory-mapped) with openSnapshot.
+    metadata (a byte string) is stored along and can be read back with snapshotMetadata.
+
+    Layout: magic, header, metadata (length and padded bytes), term offsets, term blob (terms sorted by their
+    serialized form; a term's id is its position) and nine int32 columns with the SPO, POS and OSP
+    permutations of the triples.
+    """
+    keys = set()
+    triples = []
+    for s, p, o in graph.iterTriples():
+        t = (_termKey(s), _termKey(p), _termKey(o))
+        keys.update(t)
+        triples.append(t)
+    keys = sorted(keys)
+    ids = dict((key, termId) for termId, key in enumerate(keys))
+    triples = [(ids[s], ids[p], ids[o]) for s, p, o in triples]
+    permutations = [
+        sorted(triples),
+        sorted([(p, o, s) for s, p, o in triples]),
+        sorted([(o, s, p) for s, p, o in triples]),
+    ]
+    distinctCounts = tuple(_countRuns(t[0] for t in permutation) for permutation in permutations)
+
+    # a unique temporary file: processes starting together may all write the same snapshot
+    fd, tmpPath = mkstemp(dir=dirname(abspath(path)), prefix=basename(path) + '.', suffix='.tmp')
+    try:
+        with fdopen(fd, 'wb') as f:
+            _writeSnapshotFile(f, keys, triples, permutations, distinctCounts, metadata)
+        rename(tmpPath, path)
+    except:
+        remove(tmpPath)
+        raise
+
+def _writeSnapshotFile(f, keys, triples, permutations, distinctCounts, metadata):
+    fchmod(f.fileno(), 0644)
+    f.write(MAGIC)
+    f.write(HEADER.pack(len(keys), len(triples), *distinctCounts))
+    f.write(OFFSET.pack(len(metadata)))
+    f.write(metadata + '\0' * (-len(metadata) % OFFSET.size))
+    offset = 0
+    for key in keys:
+        f.write(OFFSET.pack(offset))
+        offset += len(key)
+    f.write(OFFSET.pack(offset))
+    for key in keys:
+        f.write(key)
+    f.write('\0' * (-offset % INT.size))
+    for permutation in permutations:
+        for i in xrange(3):
+            f.write(''.join(INT.pack(t[i]) for t in permutation))
+    f.flush()
+    fsync(f.fileno())
+
+def openSnapshot(path, namespaces=None):
+    with open(path, 'rb') as f:
+        data = mmap(f.fileno(), 0, access=ACCESS_READ)
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a graph snapshot: %s" % path)
+    offset = len(MAGIC)
+    _checkSize(data, offset + HEADER.size + OFFSET.size, path)
+    header = HEADER.unpack_from(data, offset)
+    termCount, tripleCount, distinctCounts = header[0], header[1], header[2:]
+    offset += HEADER.size
+    metadataSize = OFFSET.unpack_from(data, offset)[0]
+    offset += OFFSET.size + metadataSize + (-metadataSize % OFFSET.size)
+    _checkSize(data, offset + (termCount + 1) * OFFSET.size, path)
+    terms = _SnapshotTerms(data, offset, termCount)
+    offset = terms.end + (-terms.end % INT.size)
+    if len(data) != offset + 9 * tripleCount * INT.size:
+        raise ValueError("Truncated or corrupt graph snapshot: %s" % path)
+    columns = []
+    for i in xrange(9):
+        columns.append(_SnapshotColumn(data, offset, tripleCount))
+        offset += tripleCount * INT.size
+    return FrozenGraph(terms,
+        spo=tuple(columns[0:3]),
+        pos=tuple(columns[3:6]),
+        osp=tuple(columns[6:9]),
+        distinctCounts=distinctCounts,
+        namespaces=namespaces)
+
+def _checkSize(data, size, path):
+    if len(data) < size:
+        raise ValueError("Truncated or corrupt graph snapshot: %s" % path)
+
+def snapshotMetadata(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a graph snapshot: %s" % path)
+        f.seek(HEADER.size, 1)
+        size = f.read(OFFSET.size)
+        if len(size) != OFFSET.size:
+            raise ValueError("Truncated graph snapshot: %s" % path)
+        return f.read(OFFSET.unpack(size)[0])
+
+
+class _SnapshotTerms(object):
+    def __init__(self, data, offset, termCount):
+        self._data = data
+        self._offsets = offset
+        self._blob = offset + (termCount + 1) * OFFSET.size
+        self._termCount = termCount
+        self.end = self._blob + self._offset(termCount)
+        self._keys = _SnapshotKeys(self)
+
+    def lookup(self, term):
+        if term is None:
+            return None
+        key = _termKey(term)
+        termId = bisect_left(self._keys, key)
+        if termId < self._termCount and self._key(termId) == key:
+            return termId
+        return UNKNOWN_TERM
+
+    def lookupTriple(self, subject, predicate, object):
+        lookup = self.lookup
+        return lookup(subject), lookup(predicate), lookup(object)
+
+    def decode(self, termId):
+        return _termFromKey(self._key(termId))
+
+    def _offset(self, termId):
+        return OFFSET.unpack_from(self._data, self._offsets + termId * OFFSET.size)[0]
+
+    def _key(self, termId):
+        return self._data[self._blob + self._offset(termId):self._blob + self._offset(termId + 1)]
+
+    def __len__(self):
+        return self._termCount
+
+
+class _SnapshotKeys(object):
+    def __init__(self, terms):
+        self._terms = terms
+
+    def __getitem__(self, termId):
+        return self._terms._key(termId)
+
+    def __len__(self):
+        return len(self._terms)
+
+
+class _SnapshotColumn(object):
+    def __init__(self, data, offset, length):
+        self._data = data
+        self._offset = offset
+        self._length = length
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return INT.unpack_from(self._data, self._offset + index * INT.size)[0]
+
+    def __len__(self):
+        return self._length
+
+
+def _termKey(term):
+    if isinstance(term, basestring):
+        return 'S' + _utf8(term)
+    if term.isUri():
+        return 'U' + _utf8(term.value)
+    if term.isBNode():
+        return 'B' + _utf8(term.value)
+    return 'L' + _utf8(term.lang or '') + '\0' + _utf8(term.value or '')
+
+def _termFromKey(key):
+    kind, value = key[0], key[1:].decode('utf-8')
+    if kind == 'S':
+        return value
+    if kind == 'U':
+        return Uri(value)
+    if kind == 'B':
+        return BNode(value)
+    lang, _, value = value.partition(u'\0')
+    return Literal(value, lang=lang or None)
+
+def _utf8(value):
+    return value.encode('utf-8') if isinstance(value, unicode) else value
+
+HEADER = Struct('<5Q')
+OFFSET = Struct('<Q')
+INT = Struct('<i')
@@ -0,0 +1,73 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+UNKNOWN_TERM = -1
+
+
+class TermDictionary(object):
+    """
+    Maps RDF terms (subject and predicate strings, object Uri/BNode/Literal's) to integer ids and back.
+
+    Terms are never forgotten; a TermDictionary may be shared by several graphs.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._terms = []
+
+    def encode(self, term):
+        if term is None:
+            return None
+        try:
+            return self._ids[term]
+        except KeyError:
+            termId = self._ids[term] = len(self._terms)
+            self._terms.append(term)
+            return termId
+
+    def lookup(self, term):
+        if term is None:
+            return None
+        return self._ids.get(term, UNKNOWN_TERM)
+
+    def decode(self, termId):
+        return self._terms[termId]
+
+    def encodeTriple(self, subject, predicate, object):
+        encode = self.encode
+        return encode(subject), encode(predicate), encode(object)
+
+    def lookupTriple(self, subject, predicate, object):
+        lookup = self.lookup
+        return lookup(subject), lookup(predicate), lookup(object)
+
+    def decodeTriple(self, (subject, predicate, object)):
+        terms = self._terms
+        return terms[subject], terms[predicate], terms[object]
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, term):
+        return term in self._ids
@@ -26,8 +26,11 @@
 ## end license ##
 
 from functools import partial
+from multiprocessing import Pool
 from collections import defaultdict
 
+from xml.sax.saxutils import escape, quoteattr
+
 from lxml.etree import cleanup_namespaces
 
 from meresco.core import Transparent
@@ -35,6 +38,7 @@ from meresco.xml.utils import createElement as _createElement, createSubElement
 from meresco.xml.namespaces import namespaces as defaultNamespaces, curieToUri, curieToTag
 
 from .graph import Graph
+from ._query import QueryPlan, parsePatterns
 from .uri import Uri
 from .bnode import BNode
 
@@ -42,6 +46,7 @@ from .bnode import BNode
 class Triples2RdfXml(Transparent):
     def __init__(self, namespaces=None, inlineDescriptions=False, knownTypes=None, relativeTypePositions=None, **kwargs):
         Transparent.__init__(self, **kwargs)
+        self._config = dict(namespaces=namespaces, inlineDescriptions=inlineDescriptions, knownTypes=knownTypes, relativeTypePositions=relativeTypePositions)
         namespaces=namespaces or defaultNamespaces
         self._Triples2RdfXml = partial(_Triples2RdfXml,
             namespaces=namespaces,
@@ -58,28 +63,57 @@ class Triples2RdfXml(Transparent):
         yield self.all.add(**kwargs)
 
     def asRdfXml(self, triplesOrGraph):
-        graph = triplesOrGraph
-        if not hasattr(triplesOrGraph, 'matchTriplePatterns'):
-            graph = Graph()
-            triples = triplesOrGraph
-            if hasattr(triples, 'triples'):
-                triples = triples.triples()
-            for s, p, o in triples:
-                graph.addTriple(s, p, o)
-        triples2RdfXml = self._Triples2RdfXml(graph=graph)
+        triples2RdfXml = self._Triples2RdfXml(graph=_asGraph(triplesOrGraph))
         return triples2RdfXml.asRdfXml()
 
+    def asRdfXmlStream(self, triplesOrGraph):
+        """
+        Same RDF/XML as asRdfXml, but written incrementally as UTF-8 encoded chunks (one per top-level
+        description) instead of being built as an lxml tree.
+        """
+        triples2RdfXml = self._Triples2RdfXml(graph=_asGraph(triplesOrGraph))
+        return triples2RdfXml.asRdfXmlStream()
+
+    def asRdfXmlMany(self, triplesOrGraphs, workers=None):
+        """
+        Serializes each of the graphs (or lists of triples) with asRdfXmlStream, using a pool of worker
+        processes configured like this Triples2RdfXml; returns the RDF/XML strings in input order.
+        """
+        records = [list(_iterTriples(triplesOrGraph)) for triplesOrGraph in triplesOrGraphs]
+        if workers == 1 or len(records) < 2:
+            return [''.join(self.asRdfXmlStream(triples)) for triples in records]
+        pool = Pool(processes=workers, initializer=_initWorker, initargs=(self._config,))
+        try:
+            return pool.map(_serializeInWorker, records)
+        finally:
+            pool.terminate()
+            pool.join()
+
 
 class _Triples2RdfXml(object):
     def __init__(self, graph, **kwargs):
         self.graph = graph
         self.__dict__.update(kwargs)
         self._relationRdfIds = self._gatherRelationRdfIds()
+        self._inboundSubjects = self._gatherInboundSubjects()
 
     def asRdfXml(self):
-        rdfElement = self.createElement('rdf:RDF', nsmap=self.namespaces)
+        writer = _TreeWriter(self.createElement, self.createSubElement, self.namespaces)
+        for _ in self._writeDescriptions(writer):
+            pass
+        cleanup_namespaces(writer.root)
+        return writer.root
+
+    def asRdfXmlStream(self):
+        writer = _StreamWriter(self._usedNamespaces())
+        for _ in self._writeDescriptions(writer):
+            yield writer.flush()
+        yield writer.flush()
+
+    def _writeDescriptions(self, writer):
+        writer.start('rdf:RDF')
         resourceDescriptions = defaultdict(lambda: {'types': set(), 'relations': []})
-        for (s, p, o) in self.graph.triples():
+        for (s, p, o) in self.graph.iterTriples():
             if s.startswith('_:'):
                 if len(self._leftHandSides(BNode(s))) == 1:
                     continue
@@ -98,27 +132,42 @@ class _Triples2RdfXml(object):
             else:
                 if len(self._leftHandSides(BNode(subject))) > 0:
                     attrib = {'rdf:nodeID': subject.partition('_:')[-1]}
-            descriptionNode = self.createSubElement(rdfElement, tagCurie, attrib=attrib)
-            self.serializeDescription(descriptionNode, subject, resourceDescription, resourceDescriptions)
-        cleanup_namespaces(rdfElement)
-        return rdfElement
+            writer.start(tagCurie, attrib=attrib)
+            self.serializeDescription(writer, subject, resourceDescription, resourceDescriptions, isStatementAbout=_isStatementAbout(tagCurie, attrib))
+            writer.end()
+            yield
+        writer.end()
+
+    def _usedNamespaces(self):
+        prefixes = set(['rdf'])
+        for s, p, o in self.graph.iterTriples():
+            prefixes.add(self.namespaces.uriToCurie(p).partition(':')[0])
+            if p == RDF_TYPE and o.value in self.nodePromotedTypes:
+                prefixes.add(self.nodePromotedTypes[o.value].partition(':')[0])
+        prefixes.discard('xml')
+        return [(prefix, self.namespaces[prefix]) for prefix in sorted(prefixes)]
 
     def _gatherRelationRdfIds(self):
         relationRdfIds = {}
-        for binding in self.graph.matchTriplePatterns(
-                ('?r', RDF_SUBJECT, '?s'),
-                ('?r', RDF_PREDICATE, '?p'),
-                ('?r', RDF_OBJECT, '?o')):
+        if not self.graph.count(predicate=RDF_SUBJECT):
+            return relationRdfIds
+        for binding in _REIFICATIONS.evaluate(self.graph):
             r, key = binding['r'].value, (binding['s'].value, binding['p'].value, binding['o'])
             if not r.startswith('_:'):
                 relationRdfIds[key] = r.partition("#")[-1]
         return relationRdfIds
 
-    def serializeDescription(self, descriptionNode, subject, resourceDescription, uriDescriptions):
+    def _gatherInboundSubjects(self):
+        inboundSubjects = defaultdict(set)
+        for s, p, o in self.graph.iterTriples():
+            if p != RDF_SUBJECT and o.isIdentifier():
+                inboundSubjects[o].add(s)
+        return dict(inboundSubjects)
+
+    def serializeDescription(self, writer, subject, resourceDescription, uriDescriptions, isStatementAbout=False):
         for (p, o) in sorted(resourceDescription['relations']):
-            if descriptionNode.tag == RDF_STATEMENT_TAG:
-                if descriptionNode.attrib.get(RDF_ABOUT_TAG) and p in REIFICATION_RELATIONS:
-                    continue
+            if isStatementAbout and p in REIFICATION_RELATIONS:
+                continue
             text = None
             attrib = {}
             oResourceDescription = {'relations': [], 'types': set()}
@@ -126,7 +175,7 @@ class _Triples2RdfXml(object):
             if rdfID:
                 attrib['rdf:ID'] = rdfID
             if o.isIdentifier():
-                for (_, p1, o1) in self.graph.triples(subject=o.value):
+                for (_, p1, o1) in self.graph.iterTriples(subject=o.value):
                     self._gatherRelation(oResourceDescription, p1, o1)
                 if o.isUri() and (not self.inlineDescriptions or not oResourceDescription['relations']):
                     attrib['rdf:resource'] = o.value
@@ -136,20 +185,20 @@ class _Triples2RdfXml(object):
                 if o.lang:
                     attrib['xml:lang'] = o.lang
                 text = o.value
-            predicateNode = self.createSubElement(descriptionNode, self.namespaces.uriToCurie(p), attrib=attrib, text=text)
-            if 'rdf:nodeID' in attrib or not oResourceDescription['relations']:
-                continue
-            if o.isBNode() or self.inlineDescriptions:
+            writer.start(self.namespaces.uriToCurie(p), attrib=attrib, text=text)
+            if not ('rdf:nodeID' in attrib or not oResourceDescription['relations']) and (o.isBNode() or self.inlineDescriptions):
                 attrib = {}
                 if o.isUri():
                     attrib['rdf:about'] = o.value
                 tag = self._tagCurieForNode(o, oResourceDescription)
-                nodeElement = self.createSubElement(predicateNode, tag, attrib=attrib)
+                writer.start(tag, attrib=attrib)
                 uriDescriptions.pop(o.value, None)
-                self.serializeDescription(nodeElement, o.value, oResourceDescription, uriDescriptions)
+                self.serializeDescription(writer, o.value, oResourceDescription, uriDescriptions, isStatementAbout=_isStatementAbout(tag, attrib))
+                writer.end()
+            writer.end()
 
     def _leftHandSides(self, o):
-        return set(s for s, lhsP, _ in self.graph.triples(object=o) if lhsP != RDF_SUBJECT)
+        return self._inboundSubjects.get(o, _NO_SUBJECTS)
 
     def _gatherRelation(self, resourceDescription, p, o):
         resourceDescription['relations'].append((p, o))
@@ -174,6 +223,84 @@ class _Triples2RdfXml(object):
         )
 
 
+class _TreeWriter(object):
+    def __init__(self, createElement, createSubElement, namespaces):
+        self._createElement = createElement
+        self._createSubElement = createSubElement
+        self._namespaces = namespaces
+        self._stack = []
+        self.root = None
+
+    def start(self, tagCurie, attrib=None, text=None):
+        if self._stack:
+            element = self._createSubElement(self._stack[-1], tagCurie, attrib=attrib, text=text)
+        else:
+            element = self.root = self._createElement(tagCurie, nsmap=self._namespaces)
+        self._stack.append(element)
+
+    def end(self):
+        self._stack.pop()
+
+
+class _StreamWriter(object):
+    def __init__(self, namespaces):
+        self._namespaces = namespaces
+        self._stack = []
+        self._parts = []
+
+    def start(self, tagCurie, attrib=None, text=None):
+        parts = self._parts
+        parts.append(u'<' + tagCurie)
+        if not self._stack:
+            for prefix, uri in self._namespaces:
+                parts.append(u' xmlns:%s=%s' % (prefix, quoteattr(uri)))
+        for name, value in (attrib or {}).items():
+            parts.append(u' %s=%s' % (name, quoteattr(value, _ATTRIBUTE_ENTITIES)))
+        parts.append(u'>')
+        if text:
+            parts.append(escape(text, _TEXT_ENTITIES))
+        self._stack.append(tagCurie)
+
+    def end(self):
+        self._parts.append(u'</%s>' % self._stack.pop())
+
+    def flush(self):
+        data = u''.join(self._parts).encode('utf-8')
+        self._parts = []
+        return data
+
+
+def _asGraph(triplesOrGraph):
+    if hasattr(triplesOrGraph, 'matchTriplePatterns'):
+        return triplesOrGraph
+    graph = Graph()
+    for s, p, o in _iterTriples(triplesOrGraph):
+        graph.addTriple(s, p, o)
+    return graph
+
+def _iterTriples(triplesOrGraph):
+    if hasattr(triplesOrGraph, 'iterTriples'):
+        return triplesOrGraph.iterTriples()
+    if hasattr(triplesOrGraph, 'triples'):
+        return triplesOrGraph.triples()
+    return triplesOrGraph
+
+_workerTriples2RdfXml = None
+
+def _initWorker(config):
+    global _workerTriples2RdfXml
+    _workerTriples2RdfXml = Triples2RdfXml(**config)
+
+def _serializeInWorker(triples):
+    return ''.join(_workerTriples2RdfXml.asRdfXmlStream(triples))
+
+def _isStatementAbout(tagCurie, attrib):
+    return tagCurie == 'rdf:Statement' and bool((attrib or {}).get('rdf:about'))
+
+_TEXT_ENTITIES = {'\r': '&#13;'}
+_ATTRIBUTE_ENTITIES = {'\n': '&#10;', '\r': '&#13;', '\t': '&#9;'}
+_NO_SUBJECTS = frozenset()
+
 RDF_STATEMENT_TAG = curieToTag('rdf:Statement')
 RDF_ABOUT_TAG = curieToTag('rdf:about')
 
@@ -181,8 +308,15 @@ RDF_TYPE = curieToUri('rdf:type')
 RDF_SUBJECT = curieToUri('rdf:subject')
 RDF_PREDICATE = curieToUri('rdf:predicate')
 RDF_OBJECT = curieToUri('rdf:object')
+
 REIFICATION_RELATIONS = set([RDF_SUBJECT, RDF_PREDICATE, RDF_OBJECT])
 
+# Planned once, in this order: every statement is found through its rdf:subject.
+_REIFICATIONS = QueryPlan(None, parsePatterns([
+    ('?r', RDF_SUBJECT, '?s'),
+    ('?r', RDF_PREDICATE, '?p'),
+    ('?r', RDF_OBJECT, '?o')]))
+
 NODE_PROMOTED_TYPES = set(['rdf:Statement', 'oa:Annotation'])
 
 RELATIVE_TYPE_POSITIONS = {
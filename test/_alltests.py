@@ -41,6 +41,13 @@ from literaltest import LiteralTest
 from uritest import UriTest
 from bnodetest import BNodeTest
 
+from graph.frozengraphtest import FrozenGraphTest
+from graph.snapshottest import SnapshotTest
+from graph.ntriplestest import NTriplesParserTest
+from graph.canonicaltest import CanonicalTest
+from graph.overlaygraphtest import OverlayGraphTest
+from graph.concurrentgraphtest import ConcurrentGraphTest
+from graph.quadgraphtest import QuadGraphTest
 from graph.graphcomponenttest import GraphComponentTest
 from graph.graphtest import GraphTest
 from graph.rdfparsertest import RdfParserTest
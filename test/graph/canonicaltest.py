@@ -0,0 +1,210 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+
+from random import Random
+
+from meresco.rdf.graph import Graph, Literal, Uri, BNode
+
+
+class CanonicalTest(SeecrTestCase):
+    def testDigestIndependentOfBNodeLabels(self):
+        g1 = annotationGraph(['_:a', '_:b', '_:c'])
+        g2 = annotationGraph(['_:id7', '_:x', '_:id3'])
+        self.assertEquals(g1.canonicalDigest(), g2.canonicalDigest())
+        labels1, labels2 = g1.canonicalBNodeLabels(), g2.canonicalBNodeLabels()
+        self.assertEquals([labels1['_:a'], labels1['_:b'], labels1['_:c']], [labels2['_:id7'], labels2['_:x'], labels2['_:id3']])
+        self.assertEquals(3, len(set(labels1.values())))
+        self.assertTrue(all(label.startswith('_:c') for label in labels1.values()))
+
+        g2.addTriple('_:id3', 'uri:p', Literal('changed'))
+        self.assertNotEquals(g1.canonicalDigest(), g2.canonicalDigest())
+        self.assertEquals(labels1['_:b'], g2.canonicalBNodeLabels()['_:x'])
+
+    def testGraphWithoutBNodes(self):
+        g = Graph()
+        self.assertEquals(Graph().canonicalDigest(), g.canonicalDigest())
+        g.addTriple('uri:a', 'uri:p', Literal('a'))
+        self.assertNotEquals(Graph().canonicalDigest(), g.canonicalDigest())
+        self.assertEquals({}, g.canonicalBNodeLabels())
+
+    def testIdenticalDescriptions(self):
+        def graph(labels):
+            g = Graph()
+            for label in labels:
+                g.addTriple('uri:a', 'uri:creator', BNode(label))
+                g.addTriple(label, 'uri:name', Literal('anonymous'))
+            return g
+        labels = ['_:b%s' % i for i in range(300)]
+        digest = graph(labels).canonicalDigest()
+        Random(42).shuffle(labels)
+        g = graph(labels)
+        self.assertEquals(digest, g.canonicalDigest())
+        self.assertEquals(300, len(set(g.canonicalBNodeLabels().values())))
+
+    def testIdenticalNestedDescriptions(self):
+        def graph(labels):
+            g = Graph()
+            for creator, address in labels:
+                g.addTriple('uri:a', 'uri:creator', BNode(creator))
+                g.addTriple(creator, 'uri:address', BNode(address))
+                g.addTriple(address, 'uri:city', Literal('Amsterdam'))
+            return g
+        labels = [('_:c%s' % i, '_:a%s' % i) for i in range(50)]
+        digest = graph(labels).canonicalDigest()
+        Random(42).shuffle(labels)
+        g = graph(labels)
+        self.assertEquals(digest, g.canonicalDigest())
+        self.assertEquals(100, len(set(g.canonicalBNodeLabels().values())))
+
+    def testLongList(self):
+        def graph(labels):
+            g = Graph()
+            g.addTriple('uri:a', 'uri:items', BNode(labels[0]))
+            for i, label in enumerate(labels):
+                g.addTriple(label, 'uri:first', Literal('item'))
+                g.addTriple(label, 'uri:rest', BNode(labels[i + 1]) if i + 1 < len(labels) else Uri('uri:nil'))
+            return g
+        labels = ['_:l%s' % i for i in range(1500)]
+        g1 = graph(labels)
+        Random(42).shuffle(labels)
+        g2 = graph(labels)
+        self.assertEquals(g1.canonicalDigest(), g2.canonicalDigest())
+        self.assertEquals(1500, len(set(g1.canonicalBNodeLabels().values())))
+        self.assertEquals(([], []), g1.diff(g2))
+
+    def testTiesResolvedByIncomingRelations(self):
+        def graph(x, y):
+            g = Graph()
+            g.addTriple('uri:a', 'uri:p1', BNode(x))
+            g.addTriple('uri:a', 'uri:p2', BNode(y))
+            g.addTriple(x, 'uri:name', Literal('same'))
+            g.addTriple(y, 'uri:name', Literal('same'))
+            return g
+        self.assertEquals(graph('_:x', '_:y').canonicalDigest(), graph('_:y', '_:x').canonicalDigest())
+        g = Graph()
+        g.addTriple('uri:a', 'uri:p1', BNode('_:x'))
+        g.addTriple('uri:a', 'uri:p1', BNode('_:y'))
+        g.addTriple('_:x', 'uri:name', Literal('same'))
+        g.addTriple('_:y', 'uri:name', Literal('same'))
+        self.assertNotEquals(graph('_:x', '_:y').canonicalDigest(), g.canonicalDigest())
+
+    def testCycles(self):
+        def graph(labels):
+            g = Graph()
+            for i, label in enumerate(labels):
+                g.addTriple(label, 'uri:next', BNode(labels[(i + 1) % len(labels)]))
+            g.addTriple(labels[0], 'uri:name', Literal('first'))
+            return g
+        self.assertEquals(graph(['_:a', '_:b', '_:c', '_:d']).canonicalDigest(), graph(['_:q', '_:r', '_:s', '_:t']).canonicalDigest())
+        self.assertNotEquals(graph(['_:a', '_:b', '_:c', '_:d']).canonicalDigest(), graph(['_:a', '_:b', '_:c']).canonicalDigest())
+
+    def testCycleWithTail(self):
+        def graph(a, b, c, tail):
+            g = Graph()
+            g.addTriple(a, 'uri:next', BNode(b))
+            g.addTriple(b, 'uri:next', BNode(c))
+            g.addTriple(c, 'uri:next', BNode(a))
+            g.addTriple(tail, 'uri:into', BNode(b))
+            g.addTriple('uri:x', 'uri:p', BNode(tail))
+            return g
+        self.assertEquals(graph('_:a', '_:b', '_:c', '_:t').canonicalDigest(), graph('_:z', '_:y', '_:x', '_:w').canonicalDigest())
+        self.assertEquals(4, len(set(graph('_:a', '_:b', '_:c', '_:t').canonicalBNodeLabels().values())))
+
+    def testDiff(self):
+        g1 = annotationGraph(['_:a', '_:b', '_:c'])
+        g1.addTriple('uri:annotation', 'uri:p', Literal('old'))
+        g2 = annotationGraph(['_:x', '_:y', '_:z'])
+        g2.addTriple('uri:annotation', 'uri:p', Literal('new'))
+        g2.addTriple('uri:other', 'uri:creator', BNode('_:y'))
+        self.assertEquals(([], []), g1.diff(g1))
+        additions, removals = g1.diff(g2)
+        self.assertEquals([('uri:annotation', 'uri:p', Literal('old'))], removals)
+        self.assertEquals(sorted([
+                ('uri:annotation', 'uri:p', Literal('new')),
+                ('uri:other', 'uri:creator', BNode('_:b')),
+            ]), sorted(additions))
+
+    def testDiffIdenticalTwins(self):
+        g1 = Graph()
+        g1.addTriple('uri:s1', 'uri:p', BNode('_:a'))
+        g1.addTriple('_:a', 'uri:q', Literal('x'))
+        g1.addTriple('uri:s2', 'uri:p', BNode('_:b'))
+        g1.addTriple('_:b', 'uri:q', Literal('x'))
+        g2 = Graph()
+        g2.addTriple('uri:s1', 'uri:p', BNode('_:a2'))
+        g2.addTriple('_:a2', 'uri:q', Literal('x'))
+        self.assertEquals(([], sorted([('uri:s2', 'uri:p', BNode('_:b')), ('_:b', 'uri:q', Literal('x'))])),
+            tuple(sorted(triples) for triples in g1.diff(g2)))
+        newLabel = g1.canonicalBNodeLabels()['_:b']
+        self.assertEquals((sorted([('uri:s2', 'uri:p', BNode(newLabel)), (newLabel, 'uri:q', Literal('x'))]), []),
+            tuple(sorted(triples) for triples in g2.diff(g1)))
+
+        g2.addTriple('uri:s3', 'uri:p', BNode('_:b2'))
+        g2.addTriple('_:b2', 'uri:q', Literal('x'))
+        self.assertEquals(([('uri:s3', 'uri:p', BNode('_:b'))], [('uri:s2', 'uri:p', BNode('_:b'))]), g1.diff(g2))
+
+    def testDiffChangedBNode(self):
+        g1 = annotationGraph(['_:a', '_:b', '_:c'])
+        g2 = annotationGraph(['_:x', '_:y', '_:z'])
+        g2.removeTriple('_:z', 'uri:title', Literal('Source'))
+        g2.addTriple('_:z', 'uri:title', Literal('Changed'))
+        additions, removals = g1.diff(g2)
+        newLabels = g2.canonicalBNodeLabels()
+        self.assertEquals(sorted([
+                ('_:a', 'uri:source', BNode('_:c')),
+                ('_:c', 'uri:title', Literal('Source')),
+                ('_:c', 'uri:seeAlso', Uri('uri:other')),
+                ('uri:annotation', 'uri:hasBody', BNode('_:a')),
+                ('_:a', 'uri:creator', BNode('_:b')),
+            ]), sorted(removals))
+        self.assertEquals(sorted([
+                (newLabels['_:x'], 'uri:source', BNode(newLabels['_:z'])),
+                (newLabels['_:z'], 'uri:title', Literal('Changed')),
+                (newLabels['_:z'], 'uri:seeAlso', Uri('uri:other')),
+                ('uri:annotation', 'uri:hasBody', BNode(newLabels['_:x'])),
+                (newLabels['_:x'], 'uri:creator', BNode('_:b')),
+            ]), sorted(additions))
+
+        applied = Graph()
+        for triple in g1.triples():
+            applied.addTriple(*triple)
+        for triple in removals:
+            applied.removeTriple(*triple)
+        for triple in additions:
+            applied.addTriple(*triple)
+        self.assertEquals(g2.canonicalDigest(), applied.canonicalDigest())
+
+
+def annotationGraph(labels):
+    body, creator, source = labels
+    g = Graph()
+    g.addTriple('uri:annotation', 'uri:hasBody', BNode(body))
+    g.addTriple(body, 'uri:creator', BNode(creator))
+    g.addTriple(body, 'uri:source', BNode(source))
+    g.addTriple(creator, 'uri:name', Literal('Jan', lang='nl'))
+    g.addTriple(source, 'uri:title', Literal('Source'))
+    g.addTriple(source, 'uri:seeAlso', Uri('uri:other'))
+    return g
@@ -0,0 +1,158 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+
+from threading import Thread, Event
+
+from seecr.test import SeecrTestCase
+
+from meresco.xml.namespaces import curieToUri
+from meresco.rdf.graph import Graph, ConcurrentGraph, Literal, Uri, TermDictionary
+from meresco.rdf.graph.concurrentgraph import ReadWriteLock
+
+
+class ConcurrentGraphTest(SeecrTestCase):
+    def testBehavesAsGraph(self):
+        for graph in [ConcurrentGraph(), ConcurrentGraph(termDictionary=TermDictionary())]:
+            graph.addTriple('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en'))
+            graph.addTriple('uri:a', curieToUri('skos:prefLabel'), Literal('aa', lang='nl'))
+            graph.addTriple('uri:a', curieToUri('dcterms:creator'), Uri('uri:c'))
+            with graph.bulkLoader() as loader:
+                loader.addTriple('uri:c', curieToUri('rdfs:label'), Literal('creator'))
+                loader.addTriple('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en'))
+            graph.removeTriple('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en'))
+
+            self.assertEquals(3, graph.count())
+            self.assertEquals((2, 3, 3), graph.distinctCounts())
+            self.assertEquals(Literal('aa', lang='nl'), graph.findLabel('uri:a'))
+            self.assertEquals([Uri('uri:c')], graph.objects('uri:a', curie='dcterms:creator'))
+            self.assertTrue(('uri:c', curieToUri('rdfs:label'), Literal('creator')) in graph)
+            self.assertEquals([{'c': Uri('uri:c'), 'l': Literal('creator')}], list(graph.matchTriplePatterns(
+                ('uri:a', curieToUri('dcterms:creator'), '?c'),
+                ('?c', curieToUri('rdfs:label'), '?l'))))
+
+    def testIterTriplesNotInvalidatedByWrites(self):
+        graph = Graph()
+        concurrentGraph = ConcurrentGraph()
+        for g in [graph, concurrentGraph]:
+            g.addTriple('uri:a', 'uri:p', Literal('1'))
+            g.addTriple('uri:a', 'uri:p', Literal('2'))
+        def addDuringIteration(g):
+            result = []
+            for t in g.iterTriples(subject='uri:a'):
+                g.addTriple('uri:b', 'uri:p', Literal(str(len(result))))
+                result.append(t)
+            return result
+        self.assertRaises(RuntimeError, lambda: addDuringIteration(graph))
+        self.assertEquals(2, len(addDuringIteration(concurrentGraph)))
+        self.assertEquals(4, concurrentGraph.count())
+
+    def testBulkLoadReleasesWriteLockBetweenBatches(self):
+        graph = ConcurrentGraph(termDictionary=TermDictionary(), writeBatchSize=10)
+        acquired = []
+        class CountingLock(ReadWriteLock):
+            def acquireWrite(self):
+                acquired.append(graph.count())
+                ReadWriteLock.acquireWrite(self)
+        graph._lock = CountingLock()
+        with graph.bulkLoader() as loader:
+            for i in xrange(35):
+                loader.addTriple('uri:s%s' % i, 'uri:p', Literal(str(i)))
+            self.assertEquals([], acquired)
+        self.assertEquals([0, 10, 20, 30], acquired)
+        self.assertEquals(35, graph.count())
+        self.assertEquals(Literal('34'), graph.objects('uri:s34', predicate='uri:p')[0])
+
+    def testReadWriteLock(self):
+        lock = ReadWriteLock()
+        lock.acquireRead()
+        lock.acquireRead()
+        events = []
+        writerDone = Event()
+        def write():
+            with lock.writing():
+                events.append('write')
+            writerDone.set()
+        writer = Thread(target=write)
+        writer.start()
+        writerDone.wait(0.1)
+        self.assertEquals([], events)
+        lock.releaseRead()
+        writerDone.wait(0.1)
+        self.assertEquals([], events)
+        lock.releaseRead()
+        writer.join(5)
+        self.assertEquals(['write'], events)
+
+        with lock.reading():
+            with lock.reading():
+                pass
+        with lock.writing():
+            pass
+
+    def testConcurrentReadersAndWriter(self):
+        graph = ConcurrentGraph(termDictionary=TermDictionary(), writeBatchSize=100)
+        for i in xrange(100):
+            graph.addTriple('uri:s%s' % i, curieToUri('rdfs:label'), Literal('label %s' % i))
+        stop = Event()
+        errors = []
+        readCounts = []
+        def read():
+            reads = 0
+            try:
+                while not stop.is_set():
+                    for t in graph.iterTriples(predicate=curieToUri('rdfs:label')):
+                        self.assertTrue(t[0].startswith('uri:s'))
+                    graph.findLabel('uri:s1')
+                    graph.count(predicate='uri:p')
+                    list(graph.matchTriplePatterns(('?s', 'uri:p', '?o'), ('?o', curieToUri('rdfs:label'), '?l')))
+                    reads += 1
+            except Exception, e:
+                errors.append(e)
+            readCounts.append(reads)
+        def write():
+            try:
+                for round in xrange(20):
+                    with graph.bulkLoader() as loader:
+                        for i in xrange(500):
+                            loader.addTriple('uri:x%s' % i, 'uri:p', Uri('uri:s%s' % (i % 100)))
+                    for i in xrange(500):
+                        graph.removeTriple('uri:x%s' % i, 'uri:p', Uri('uri:s%s' % (i % 100)))
+                    graph.addTriple('uri:s%s' % round, curieToUri('rdfs:label'), Literal('round %s' % round))
+            except Exception, e:
+                errors.append(e)
+        readers = [Thread(target=read) for _ in xrange(4)]
+        for reader in readers:
+            reader.start()
+        writer = Thread(target=write)
+        writer.start()
+        writer.join(60)
+        stop.set()
+        for reader in readers:
+            reader.join(60)
+
+        self.assertEquals([], errors)
+        self.assertEquals(4, len(readCounts))
+        self.assertEquals(120, graph.count())
+        self.assertEquals(0, graph.count(predicate='uri:p'))
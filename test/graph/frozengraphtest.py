@@ -0,0 +1,96 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+
+from meresco.xml.namespaces import curieToUri
+from meresco.rdf.graph import Graph, FrozenGraph, Literal, Uri, BNode, TermDictionary
+
+
+class FrozenGraphTest(SeecrTestCase):
+    def testSameTriplesAsGraph(self):
+        g = Graph()
+        for s in ['x', '1']:
+            for p in ['y', '2']:
+                for o in [Uri('z'), Literal('3'), BNode('_:4')]:
+                    g.addTriple(s, p, o)
+        frozen = g.freeze()
+        self.assertTrue(isinstance(frozen, FrozenGraph))
+        for s in [None, 'x', '1', 'unknown']:
+            for p in [None, 'y', '2', 'unknown']:
+                for o in [None, Uri('z'), Literal('3'), BNode('_:4'), Literal('z'), Uri('unknown')]:
+                    self.assertEquals(sorted(g.triples(s, p, o)), sorted(frozen.triples(s, p, o)), (s, p, o))
+                    self.assertEquals(g.count(s, p, o), frozen.count(s, p, o), (s, p, o))
+                    self.assertEquals((s, p, o) in g, (s, p, o) in frozen)
+        self.assertEquals(sorted(g), sorted(frozen))
+        self.assertEquals(12, frozen.count())
+        self.assertEquals((2, 2, 3), frozen.distinctCounts())
+        self.assertTrue(frozen is frozen.freeze())
+
+    def testFreezeGraphWithTermDictionary(self):
+        g = Graph(termDictionary=TermDictionary())
+        g.addTriple('uri:a', 'uri:p', Literal('a', lang='nl'))
+        g.addTriple('uri:b', 'uri:p', Literal('a', lang='en'))
+        frozen = g.freeze()
+        self.assertEquals([('uri:b', 'uri:p', Literal('a', lang='en'))], frozen.triples(object=Literal('a', lang='en')))
+        self.assertEquals([Literal('a', lang='nl')], frozen.objects(subject='uri:a', predicate='uri:p'))
+
+    def testReadApi(self):
+        g = Graph()
+        g.addTriple('uri:a', curieToUri('rdfs:label'), Literal('label', lang='en'))
+        g.addTriple('uri:a', curieToUri('skos:prefLabel'), Literal('etiket', lang='nl'))
+        g.addTriple('uri:a', curieToUri('dcterms:creator'), Uri('uri:c'))
+        g.addTriple('uri:c', curieToUri('rdfs:label'), Literal('creator'))
+        frozen = g.freeze()
+        self.assertEquals(Literal('etiket', lang='nl'), frozen.findLabel('uri:a'))
+        self.assertEquals([Literal('label', lang='en'), Literal('creator'), None], frozen.findLabels(['uri:a', 'uri:c', 'uri:x'], languages=['en', None]))
+        self.assertEquals('creator', frozen.literalValue('uri:c', curie='rdfs:label'))
+        self.assertEquals([Uri('uri:c')], frozen.objects('uri:a', curie='dcterms:creator'))
+        self.assertEquals(
+            [dict(a=Uri('uri:a'), c=Uri('uri:c'), l=Literal('creator'))],
+            list(frozen.matchTriplePatterns(('?a', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('rdfs:label'), '?l'))))
+        self.assertEquals(
+            [dict(a=Uri('uri:a'), c=Uri('uri:c'), l=Literal('creator'))],
+            list(frozen.prepare(('?a', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('rdfs:label'), '?l')).match(bulk=True)))
+        self.assertEquals(2, len(frozen.explain(('?a', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('rdfs:label'), '?l'))))
+
+    def testImmutable(self):
+        frozen = Graph().freeze()
+        self.assertEquals([], frozen.triples())
+        self.assertEquals(0, frozen.count())
+        self.assertFalse(hasattr(frozen, 'addTriple'))
+        self.assertFalse(hasattr(frozen, 'removeTriple'))
+
+    def testColumns(self):
+        g = Graph()
+        g.addTriple('uri:b', 'uri:p', Uri('uri:a'))
+        g.addTriple('uri:a', 'uri:p', Uri('uri:b'))
+        g.addTriple('uri:a', 'uri:q', Uri('uri:b'))
+        frozen = g.freeze()
+        spo, pos, osp = frozen._permutations  # Whitebox: sorted columns of term ids
+        decode = frozen._terms.decode
+        self.assertEquals([('uri:a', 'uri:p', Uri('uri:b')), ('uri:a', 'uri:q', Uri('uri:b')), ('uri:b', 'uri:p', Uri('uri:a'))],
+            sorted((decode(s), decode(p), decode(o)) for s, p, o in zip(*spo)))
+        for columns in [spo, pos, osp]:
+            self.assertEquals(sorted(zip(*columns)), zip(*columns))
@@ -24,18 +24,20 @@
 #
 ## end license ##
 
-from seecr.test import SeecrTestCase
+from seecr.test import SeecrTestCase, CallTrace
 from seecr.test.io import stdout_replaced
 
-from os import makedirs
-from os.path import join, dirname, abspath
+from os import makedirs, utime, remove
+from os.path import join, dirname, abspath, isfile, getmtime, basename
 from shutil import copy
+from threading import Event
 
 from lxml.etree import parse
 from StringIO import StringIO
 
 from meresco.xml.namespaces import namespaces, curieToUri
-from meresco.rdf.graph import Literal, Uri, BNode, GraphComponent
+from meresco.rdf.graph import Graph, Literal, Uri, BNode, GraphComponent, FrozenGraph
+from meresco.rdf.graph.graphcomponent import iterRdfSources
 
 mydir = dirname(abspath(__file__))
 rdfDir = join(dirname(mydir), 'data')
@@ -72,6 +74,245 @@ class GraphComponentTest(SeecrTestCase):
         self.assertEquals(Literal('Maker', lang='nl'), g.findLabel(namespaces.dcterms + 'creator'))
         self.assertEquals(Literal('Tijd', lang='nl'), g.findLabel("http://purl.org/NET/c4dm/event.owl#time"))
 
+    def testFrozenGraph(self):
+        copy(join(rdfDir, 'nl_property_labels.rdf'), self.tempdir)
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir])
+            frozen = GraphComponent(rdfSources=[self.tempdir], freeze=True)
+        self.assertTrue(isinstance(frozen._graph, FrozenGraph))
+        self.assertEquals(g.count(), frozen.count())
+        self.assertEquals(Literal('Titel', lang='nl'), frozen.findLabel(namespaces.dcterms + 'title'))
+
+    def testSnapshot(self):
+        sourceDir = join(self.tempdir, 'sources')
+        makedirs(sourceDir)
+        copy(join(rdfDir, 'nl_property_labels.rdf'), sourceDir)
+        snapshotPath = join(self.tempdir, 'graph.snapshot')
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[sourceDir])
+            snapshot = GraphComponent(rdfSources=[sourceDir], snapshotPath=snapshotPath)
+        self.assertTrue(isfile(snapshotPath))
+        self.assertTrue(isinstance(snapshot._graph, FrozenGraph))
+        self.assertEquals(g.count(), snapshot.count())
+        self.assertEquals(Literal('Titel', lang='nl'), snapshot.findLabel(namespaces.dcterms + 'title'))
+
+        snapshotTime = getmtime(snapshotPath)
+        with stdout_replaced():
+            GraphComponent(rdfSources=[sourceDir], snapshotPath=snapshotPath)
+        self.assertEquals(snapshotTime, getmtime(snapshotPath))
+
+        utime(join(sourceDir, 'nl_property_labels.rdf'), (getmtime(snapshotPath) + 10,) * 2)
+        with stdout_replaced():
+            snapshot = GraphComponent(rdfSources=[sourceDir], snapshotPath=snapshotPath)
+        self.assertEquals(g.count(), snapshot.count())
+
+    def testSnapshotNoticesChangedSources(self):
+        sourceDir = join(self.tempdir, 'sources')
+        makedirs(join(sourceDir, 'sub'))
+        def write(path, title):
+            with open(path, 'w') as f:
+                f.write('<uri:%s> <%s> "%s" .\n' % (title, namespaces.dcterms + 'title', title))
+            utime(path, (1000000000, 1000000000))
+        def titles(rdfSources):
+            with stdout_replaced():
+                g = GraphComponent(rdfSources=rdfSources, snapshotPath=join(self.tempdir, 'graph.snapshot'))
+            return sorted(o.value for _, _, o in g.triples(predicate=namespaces.dcterms + 'title'))
+        write(join(sourceDir, 'sub', 'a.nt'), 'a')
+        write(join(sourceDir, 'b.nt'), 'b')
+        self.assertEquals(['a', 'b'], titles([sourceDir]))
+
+        remove(join(sourceDir, 'sub', 'a.nt'))
+        self.assertEquals(['b'], titles([sourceDir]))
+
+        write(join(sourceDir, 'sub', 'c.nt'), 'c')
+        self.assertEquals(['b', 'c'], titles([sourceDir]))
+
+        write(join(self.tempdir, 'd.nt'), 'd')
+        self.assertEquals(['b', 'c', 'd'], titles([sourceDir, join(self.tempdir, 'd.nt')]))
+        self.assertEquals(['b', 'c'], titles([sourceDir]))
+
+    def testReload(self):
+        def write(filename, titles):
+            with open(join(self.tempdir, filename), 'w') as f:
+                f.write(RDF_XML_TITLES % ''.join('<dcterms:title>%s</dcterms:title>' % title for title in titles))
+        def titles():
+            return sorted(o.value for o in g.objects(subject='uri:uri', predicate=namespaces.dcterms + 'title'))
+        write('a.rdf', ['a', 'shared'])
+        write('b.rdf', ['b', 'shared'])
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir], reloadable=True)
+        self.assertEquals(['a', 'b', 'shared'], titles())
+
+        parsed = []
+        originalParse = g._parse
+        g._parse = lambda source, sink: parsed.append(basename(source)) or originalParse(source, sink)
+        g.reload()
+        self.assertEquals([], parsed)
+
+        write('b.rdf', ['b', 'changed'])
+        utime(join(self.tempdir, 'b.rdf'), (getmtime(join(self.tempdir, 'a.rdf')) + 10,) * 2)
+        g.reload()
+        self.assertEquals(['b.rdf'], parsed)
+        self.assertEquals(['a', 'b', 'changed', 'shared'], titles())
+
+        remove(join(self.tempdir, 'a.rdf'))
+        write('c.rdf', ['c'])
+        g.reload()
+        self.assertEquals(['b.rdf', 'c.rdf'], parsed)
+        self.assertEquals(['b', 'c', 'changed'], titles())
+        self.assertEquals(3, g.count())
+        self.assertEquals([('uri:uri', namespaces.dcterms + 'title', Literal('c'))], g.triples(context='file:c.rdf'))
+        self.assertEquals(['file:b.rdf', 'file:c.rdf'], sorted(g.contexts()))
+        self.assertEquals(sorted(context for context, _, _ in iterRdfSources([self.tempdir])), sorted(g.contexts()))
+
+    def testReloadFilesWithTheSameName(self):
+        makedirs(join(self.tempdir, 'sub'))
+        def write(filename, title):
+            with open(join(self.tempdir, filename), 'w') as f:
+                f.write(RDF_XML_TITLES % '<dcterms:title>%s</dcterms:title>' % title)
+        def titles():
+            return sorted(o.value for o in g.objects(subject='uri:uri', predicate=namespaces.dcterms + 'title'))
+        write('a.rdf', 'top')
+        write(join('sub', 'a.rdf'), 'sub')
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir], reloadable=True)
+        self.assertEquals(['file:a.rdf'], g.contexts())
+        self.assertEquals(['sub', 'top'], titles())
+
+        write(join('sub', 'a.rdf'), 'changed')
+        utime(join(self.tempdir, 'sub', 'a.rdf'), (getmtime(join(self.tempdir, 'a.rdf')) + 10,) * 2)
+        g.reload()
+        self.assertEquals(['changed', 'top'], titles())
+
+    def testParsesStraightIntoGraph(self):
+        for name in ['a', 'b']:
+            with open(join(self.tempdir, name + '.rdf'), 'w') as f:
+                f.write(RDF_XML_TITLES % '<dcterms:title>%s</dcterms:title>' % name)
+        loaded = []
+        class MyGraphComponent(GraphComponent):
+            def _parse(self, source, sink):
+                loaded.append((basename(source), sink._graph.count()))
+                GraphComponent._parse(self, source, sink)
+        with stdout_replaced():
+            g = MyGraphComponent(rdfSources=[self.tempdir])
+        self.assertEquals([0, 1], sorted(count for _, count in loaded))
+        self.assertEquals(2, g.count())
+
+    def testReloadRequiresReloadable(self):
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[])
+            frozen = GraphComponent(rdfSources=[], freeze=True)
+            self.assertRaises(ValueError, lambda: GraphComponent(rdfSources=[], freeze=True, reloadable=True))
+        self.assertEquals(Graph, type(g._graph))
+        self.assertRaises(RuntimeError, g.reload)
+        self.assertRaises(RuntimeError, frozen.reload)
+
+    def testReloadInBackground(self):
+        def write(filename, titles):
+            with open(join(self.tempdir, filename), 'w') as f:
+                f.write(RDF_XML_TITLES % ''.join('<dcterms:title>%s</dcterms:title>' % title for title in titles))
+        def titles():
+            return sorted(o.value for o in g.objects(subject='uri:uri', predicate=namespaces.dcterms + 'title'))
+        write('a.rdf', ['a'])
+        for freeze in [False, True]:
+            write('b.rdf', ['b'])
+            with stdout_replaced():
+                g = GraphComponent(rdfSources=[self.tempdir], freeze=freeze, name='vocabulary')
+            observer = CallTrace()
+            g.addObserver(observer)
+            originalParse = g._parse
+            parsing, proceed = Event(), Event()
+            def parse(source, sink):
+                parsing.set()
+                proceed.wait()
+                originalParse(source, sink)
+            g._parse = parse
+            write('b.rdf', ['b', 'changed'])
+
+            thread = g.reloadInBackground()
+            parsing.wait(5)
+            self.assertEquals(['a', 'b'], titles())
+            self.assertEquals([], observer.calledMethodNames())
+            proceed.set()
+            thread.join(5)
+
+            self.assertEquals(['a', 'b', 'changed'], titles())
+            self.assertEquals(['graphReloaded'], observer.calledMethodNames())
+            kwargs = observer.calledMethods[0].kwargs
+            self.assertEquals(['name', 'previousTriples', 'seconds', 'triples'], sorted(kwargs))
+            self.assertEquals(('vocabulary', 2, 3), (kwargs['name'], kwargs['previousTriples'], kwargs['triples']))
+            self.assertTrue(kwargs['seconds'] >= 0)
+
+    def testPreparedQueryFollowsReload(self):
+        def write(title):
+            with open(join(self.tempdir, 'a.rdf'), 'w') as f:
+                f.write(RDF_XML_TITLES % '<dcterms:title>%s</dcterms:title>' % title)
+        write('old')
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir])
+        query = g.prepare(('uri:uri', namespaces.dcterms + 'title', '?title'))
+        self.assertEquals([dict(title=Literal('old'))], list(query.match()))
+        write('new')
+        g.reloadInBackground().join(5)
+        self.assertEquals([Literal('new')], g.objects(subject='uri:uri', predicate=namespaces.dcterms + 'title'))
+        self.assertEquals([dict(title=Literal('new'))], list(query.match()))
+
+    def testReloadInBackgroundFailure(self):
+        with open(join(self.tempdir, 'a.rdf'), 'w') as f:
+            f.write(RDF_XML_TITLES % '<dcterms:title>a</dcterms:title>')
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir])
+        observer = CallTrace()
+        g.addObserver(observer)
+        with open(join(self.tempdir, 'b.rdf'), 'w') as f:
+            f.write('<not rdf')
+        g.reloadInBackground().join(5)
+        self.assertEquals(['graphReloadFailed'], observer.calledMethodNames())
+        kwargs = observer.calledMethods[0].kwargs
+        self.assertEquals(['error', 'name', 'seconds'], sorted(kwargs))
+        self.assertTrue(isinstance(kwargs['error'], Exception))
+        self.assertEquals(1, g.count())
+
+    def testParallelism(self):
+        for name in ['a', 'b', 'c']:
+            with open(join(self.tempdir, name + '.rdf'), 'w') as f:
+                f.write(RDF_XML_NAVIGATION.replace('uri:nav', 'uri:' + name))
+        copy(join(rdfDir, 'nl_property_labels.rdf'), self.tempdir)
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir])
+            parallel = GraphComponent(rdfSources=[self.tempdir], parallelism=2)
+            frozen = GraphComponent(rdfSources=[self.tempdir], parallelism=2, freeze=True)
+        self.assertEquals(g.count(), parallel.count())
+        self.assertEquals(g.count(), frozen.count())
+        self.assertEquals(Literal('Titel', lang='nl'), parallel.findLabel(namespaces.dcterms + 'title'))
+        for graph in [parallel, frozen]:
+            publishers = [o for s, p, o in graph.triples(predicate=namespaces.dcterms + 'publisher')]
+            self.assertEquals(3, len(set(publishers)))
+            for publisher in publishers:
+                self.assertTrue(publisher.isBNode())
+                self.assertEquals(1, len(graph.triples(subject=publisher.value)))
+
+    def testNTriplesSource(self):
+        with open(join(self.tempdir, 'labels.nt'), 'w') as f:
+            f.write('<uri:a> <%s> "Titel"@nl .\n' % curieToUri('rdfs:label'))
+        copy(join(rdfDir, 'nl_property_labels.rdf'), self.tempdir)
+        with stdout_replaced():
+            g = GraphComponent(rdfSources=[self.tempdir])
+        self.assertEquals(Literal('Titel', lang='nl'), g.findLabel('uri:a'))
+        self.assertEquals(Literal('Titel', lang='nl'), g.findLabel(namespaces.dcterms + 'title'))
+
+    def testNTriplesBlankNodesAreLocalToTheirFile(self):
+        for name, creator in [('a', 'Alice'), ('b', 'Bob')]:
+            with open(join(self.tempdir, name + '.nt'), 'w') as f:
+                f.write('<uri:%s> <uri:creator> _:b0 .\n_:b0 <uri:name> "%s" .\n' % (name, creator))
+        for kwargs in [{}, dict(parallelism=2), dict(freeze=True), dict(reloadable=True)]:
+            with stdout_replaced():
+                g = GraphComponent(rdfSources=[self.tempdir], **kwargs)
+            for name, creator in [('a', 'Alice'), ('b', 'Bob')]:
+                creators = g.objects(subject='uri:' + name, predicate='uri:creator')
+                self.assertEquals(1, len(creators))
+                self.assertEquals([Literal(creator)], g.objects(subject=creators[0].value, predicate='uri:name'), kwargs)
+
     def testTriplesUsingRealOntology(self):
         subdir = join(self.tempdir, 'subdir')
         makedirs(subdir)
@@ -109,6 +350,19 @@ class GraphComponentTest(SeecrTestCase):
             [(bnode.value, namespaces.rdfs+'label', Literal('Pub'))],
             result)
 
+    def testDiffWithGraph(self):
+        with open(join(self.tempdir, 'a.nt'), 'w') as f:
+            f.write('<uri:s> <uri:p> "old" .\n<uri:s> <uri:q> _:b .\n_:b <uri:name> "Jan" .\n')
+        graph = Graph()
+        graph.addTriple('uri:s', 'uri:p', Literal('new'))
+        graph.addTriple('uri:s', 'uri:q', BNode('_:x'))
+        graph.addTriple('_:x', 'uri:name', Literal('Jan'))
+        for freeze in [False, True]:
+            with stdout_replaced():
+                gc = GraphComponent(rdfSources=[join(self.tempdir, 'a.nt')], freeze=freeze)
+            self.assertEquals(([('uri:s', 'uri:p', Literal('new'))], [('uri:s', 'uri:p', Literal('old'))]), gc.diff(graph))
+            self.assertEquals(([('uri:s', 'uri:p', Literal('old'))], [('uri:s', 'uri:p', Literal('new'))]), graph.diff(gc))
+
     def testInitializeGraphComponentFromRdfObjects(self):
         class A(object):
             @property
@@ -128,6 +382,8 @@ class GraphComponentTest(SeecrTestCase):
         with stdout_replaced():
             gc = GraphComponent(rdfSources=[A()])
         self.assertEquals([("uri:someUri", curieToUri("rdfs:label"), Literal("Some resource", lang="nl"))], list(gc.triples()))
+        self.assertRaises(ValueError, lambda: GraphComponent(rdfSources=[A()], snapshotPath=join(self.tempdir, 'graph.snapshot')))
+        self.assertFalse(isfile(join(self.tempdir, 'graph.snapshot')))
 
 def parseXml(data):
     return parse(StringIO(data))
@@ -140,6 +396,10 @@ RDF_XML = '''<rdf:RDF %(xmlns_rdf)s>
 </rdf:Description>
 </rdf:RDF>''' % namespaces
 
+RDF_XML_TITLES = '''<rdf:RDF %(xmlns_rdf)s %(xmlns_dcterms)s>
+<rdf:Description rdf:about="uri:uri">%%s</rdf:Description>
+</rdf:RDF>''' % namespaces
+
 RDF_XML_NAVIGATION = '''<rdf:RDF %(xmlns_rdf)s>
 <rdf:Description %(xmlns_dcterms)s %(xmlns_rdfs)s rdf:about="uri:nav">
     <dcterms:publisher>
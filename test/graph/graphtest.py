@@ -25,8 +25,12 @@
 #
 ## end license ##
 
-from meresco.xml.namespaces import curieToUri
-from meresco.rdf.graph import Graph, Literal, Uri, BNode
+from gc import isenabled as isgcenabled
+
+from lxml.etree import XML
+
+from meresco.xml.namespaces import curieToUri, namespaces
+from meresco.rdf.graph import Graph, Literal, Uri, BNode, TermDictionary, RDFParser
 
 from seecr.test import SeecrTestCase
 
@@ -36,7 +40,7 @@ class GraphTest(SeecrTestCase):
         g = Graph()
         g.addTriple('x', 'y', 'z')
         g.addTriple(subject='a', predicate='b', object='c')
-        self.assertEquals([('x', 'y', 'z'), ('a', 'b', 'c')], list(g.triples()))
+        self.assertEquals([('a', 'b', 'c'), ('x', 'y', 'z')], sorted(g.triples()))
 
         # 'x', 'y', 'z'  -->       # 000
         g.addTriple('x', 'y', '3') # 001
@@ -67,11 +71,14 @@ class GraphTest(SeecrTestCase):
         g.addTriple(subject='u:ri', predicate='p:redicate', object='obj2')
 
         self.assertEquals(2, len(list(g.triples())))
-        self.assertEquals(12, len(g._tripleDict))  # Whitebox no-leaking defaultdict entries on delete
+        self.assertEquals(2, len(g._osp))  # Whitebox no-leaking index entries on delete
 
         g.removeTriple(subject='u:ri', predicate='p:redicate', object='obj2')
 
-        self.assertEquals(8, len(g._tripleDict))  # Whitebox no-leaking defaultdict entries on delete
+        self.assertEquals({'u:ri': {'p:redicate': set(['obj'])}}, g._spo)  # Whitebox no-leaking index entries on delete
+        self.assertEquals({'p:redicate': {'obj': set(['u:ri'])}}, g._pos)
+        self.assertEquals({'obj': {'u:ri': set(['p:redicate'])}}, g._osp)
+        self.assertEquals(({'u:ri': 1}, {'p:redicate': 1}, {'obj': 1}), (g._subjectCounts, g._predicateCounts, g._objectCounts))
 
         # Keep 1
         self.assertEquals(1, len(list(g.triples())))
@@ -93,11 +100,125 @@ class GraphTest(SeecrTestCase):
         g = Graph()
 
         self.assertEquals(0, len(list(g.triples())))
-        self.assertEquals(0, len(g._tripleDict))  # Whitebox no-leaking defaultdict entries on delete
 
         g.removeTriple(subject='u:ri', predicate='p:redicate', object='obj2')
 
-        self.assertEquals(0, len(g._tripleDict))  # Whitebox no-leaking defaultdict entries on delete
+        self.assertEquals(({}, {}, {}), (g._spo, g._pos, g._osp))  # Whitebox no-leaking index entries on delete
+
+        g.addTriple(subject='u:ri', predicate='p:redicate', object='obj')
+        g.removeTriple(subject='u:ri', predicate='p:redicate', object='obj2')
+        g.removeTriple(subject='u:ri', predicate='p:redicate', object='obj')
+        self.assertEquals(({}, {}, {}), (g._spo, g._pos, g._osp))
+        self.assertEquals(({}, {}, {}), (g._subjectCounts, g._predicateCounts, g._objectCounts))
+
+    def testIterTriples(self):
+        g = Graph()
+        g.addTriple('uri:x', 'uri:y', Uri('uri:z'))
+        g.addTriple('uri:x', 'uri:y', Literal('z'))
+        g.addTriple('uri:z', 'uri:y', Uri('uri:x'))
+        triples = g.iterTriples(subject='uri:x')
+        self.assertFalse(isinstance(triples, list))
+        self.assertEquals(sorted(g.triples(subject='uri:x')), sorted(triples))
+        self.assertEquals(sorted(g.triples()), sorted(g))
+        self.assertEquals([('uri:z', 'uri:y', Uri('uri:x'))], list(g.iterTriples(object=Uri('uri:x'))))
+
+    def testIterTriplesRaisesOnModification(self):
+        g = Graph()
+        g.addTriple('uri:x', 'uri:y', Uri('uri:z'))
+        g.addTriple('uri:x', 'uri:y', Literal('z'))
+        triples = g.iterTriples()
+        triples.next()
+        g.addTriple('uri:a', 'uri:b', Literal('c'))
+        self.assertRaises(RuntimeError, lambda: triples.next())
+
+        triples = g.iterTriples()
+        triples.next()
+        g.addTriple('uri:a', 'uri:b', Literal('c'))  # no actual change
+        triples.next()
+
+        for s, p, o in g.triples():
+            g.removeTriple(s, p, o)
+        self.assertEquals([], list(g))
+
+    def testCount(self):
+        g = Graph()
+        for s in ['x', '1']:
+            for p in ['y', '2']:
+                for o in ['z', '3']:
+                    g.addTriple(s, p, o)
+        g.addTriple('x', 'y', 'z')
+        g.addTriple('q', 'y', 'z')
+        for s in [None, 'x', 'q', 'unknown']:
+            for p in [None, 'y', 'unknown']:
+                for o in [None, 'z', 'unknown']:
+                    self.assertEquals(len(g.triples(s, p, o)), g.count(s, p, o), (s, p, o))
+        self.assertEquals(9, g.count())
+        g.removeTriple('x', 'y', 'z')
+        g.removeTriple('x', 'y', 'z')
+        self.assertEquals(8, g.count())
+        self.assertEquals(3, g.count(subject='x'))
+        self.assertEquals(4, g.count(object='z'))
+        self.assertEquals(2, g.count(predicate='y', object='z'))
+
+    def testCountWithTermDictionary(self):
+        g = Graph(termDictionary=TermDictionary())
+        g.addTriple('uri:x', 'uri:y', Uri('uri:z'))
+        g.addTriple('uri:x', 'uri:y', Literal('z'))
+        self.assertEquals(2, g.count(subject='uri:x'))
+        self.assertEquals(1, g.count(object=Literal('z')))
+        self.assertEquals(0, g.count(object=Literal('unknown')))
+
+    def testBulkLoader(self):
+        g = Graph()
+        g.addTriple('uri:a', 'uri:p', Literal('existing'))
+        triples = g.iterTriples()
+        with g.bulkLoader() as loader:
+            loader.addTriple('uri:a', 'uri:p', Literal('existing'))
+            loader.addTriple('uri:a', 'uri:p', Uri('uri:b'))
+            loader.addTriple('uri:a', 'uri:p', Uri('uri:b'))
+            loader.addTriples([('uri:b', 'uri:q', Literal('b')), (Uri('uri:c'), Uri('uri:q'), Literal('c'))])
+            self.assertEquals(1, g.count())
+            self.assertFalse(isgcenabled())
+        self.assertTrue(isgcenabled())
+        self.assertEquals(4, g.count())
+        self.assertEquals(set([
+                ('uri:a', 'uri:p', Literal('existing')),
+                ('uri:a', 'uri:p', Uri('uri:b')),
+                ('uri:b', 'uri:q', Literal('b')),
+                ('uri:c', 'uri:q', Literal('c')),
+            ]), set(g.triples()))
+        self.assertEquals(2, g.count(predicate='uri:q'))
+        self.assertEquals(2, g.count(subject='uri:a'))
+        self.assertEquals([('uri:c', 'uri:q', Literal('c'))], g.triples(object=Literal('c')))
+        self.assertRaises(RuntimeError, lambda: list(triples))
+
+    def testBulkLoaderDiscardsTriplesOnException(self):
+        g = Graph()
+        try:
+            with g.bulkLoader() as loader:
+                loader.addTriple('uri:a', 'uri:p', Literal('a'))
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertTrue(isgcenabled())
+        self.assertEquals(0, g.count())
+
+    def testAddTriplesDeferIndexing(self):
+        g = Graph(termDictionary=TermDictionary())
+        g.addTriples([('uri:a', 'uri:p', Literal('a')), ('uri:a', 'uri:p', Literal('a')), ('uri:b', 'uri:p', Literal('a'))], deferIndexing=True)
+        self.assertEquals(2, g.count())
+        self.assertEquals(2, g.count(object=Literal('a')))
+        self.assertEquals(['uri:a', 'uri:b'], sorted(s for s, _, _ in g.triples(predicate='uri:p')))
+
+    def testBulkLoaderAsRDFParserSink(self):
+        g = Graph()
+        with g.bulkLoader() as loader:
+            RDFParser(sink=loader).parse(XML('''<rdf:RDF %(xmlns_rdf)s %(xmlns_rdfs)s>
+    <rdf:Description rdf:about="uri:a">
+        <rdfs:label>A</rdfs:label>
+    </rdf:Description>
+</rdf:RDF>''' % namespaces))
+        self.assertEquals([('uri:a', curieToUri('rdfs:label'), Literal('A'))], g.triples())
 
     def testGraphContains(self):
         g = Graph()
@@ -169,6 +290,51 @@ class GraphTest(SeecrTestCase):
         self.assertEquals(None, g.findLabel(uri='u:ri2', labelPredicates=[curieToUri('rdfs:label')]))
         self.assertEquals(Literal('altLabel'), g.findLabel(uri='u:ri2', labelPredicates=[curieToUri('rdfs:label'), curieToUri('skos:altLabel')]))
 
+    def testGraphFindLabelLanguagePreference(self):
+        g = Graph()
+        g.addTriple('u:ri', curieToUri('rdfs:label'), Literal('label'))
+        g.addTriple('u:ri', curieToUri('rdfs:label'), Literal('labelEN', lang='en'))
+        g.addTriple('u:ri', curieToUri('skos:prefLabel'), Literal('prefLabelDE', lang='de'))
+        self.assertEquals(Literal('labelEN', lang='en'), g.findLabel(uri='u:ri'))
+        self.assertEquals(Literal('prefLabelDE', lang='de'), g.findLabel(uri='u:ri', languages=['de', 'en']))
+        self.assertEquals(Literal('label'), g.findLabel(uri='u:ri', languages=[None, 'de']))
+        self.assertEquals(None, g.findLabel(uri='u:ri', languages=['fr']))
+        self.assertEquals(None, g.findLabel(uri='u:ri', languages=[]))
+
+    def testGraphFindLabels(self):
+        for g in [Graph(), Graph(termDictionary=TermDictionary())]:
+            g.addTriple('u:ri1', curieToUri('rdfs:label'), Literal('one'))
+            g.addTriple('u:ri2', curieToUri('skos:prefLabel'), Literal('twee', lang='nl'))
+            g.addTriple('u:ri2', curieToUri('rdfs:label'), Literal('two', lang='en'))
+            g.addTriple('u:ri3', curieToUri('skos:prefLabel'), Uri('u:ri1'))
+            self.assertEquals([Literal('one'), Literal('twee', lang='nl'), None, None], g.findLabels(['u:ri1', 'u:ri2', 'u:ri3', 'u:unknown']))
+            self.assertEquals([Literal('one'), Literal('two', lang='en')], g.findLabels(['u:ri1', 'u:ri2'], languages=['en', None]))
+            self.assertEquals([], g.findLabels([]))
+
+    def testGraphLabelIndexIsMaintained(self):
+        for g in [Graph(), Graph(termDictionary=TermDictionary())]:
+            g.addTriple('u:ri', curieToUri('rdfs:label'), Literal('label'))
+            self.assertEquals(Literal('label'), g.findLabel(uri='u:ri'))
+            self.assertEquals(Literal('label'), g.findLabel(uri='u:ri', languages=['en', None]))
+            self.assertEquals(2, len(g._labelIndexes))
+
+            g.addTriple('u:ri', curieToUri('skos:altLabel'), Literal('altLabelEN', lang='en'))
+            g.addTriple('u:ri', curieToUri('foaf:name'), Literal('nameEN', lang='en'))
+            with g.bulkLoader() as loader:
+                loader.addTriple('u:ri', curieToUri('skos:prefLabel'), Literal('prefLabelNL', lang='nl'))
+                loader.addTriple('u:ri2', curieToUri('rdfs:label'), Literal('label2'))
+            self.assertEquals([Literal('prefLabelNL', lang='nl'), Literal('label2')], g.findLabels(['u:ri', 'u:ri2']))
+            self.assertEquals(Literal('nameEN', lang='en'), g.findLabel(uri='u:ri', languages=['en', None]))
+
+            g.removeTriple('u:ri', curieToUri('skos:prefLabel'), Literal('prefLabelNL', lang='nl'))
+            self.assertEquals(Literal('nameEN', lang='en'), g.findLabel(uri='u:ri'))
+            g.removeTriple('u:ri', curieToUri('rdfs:label'), Literal('label'))
+            g.removeTriple('u:ri', curieToUri('foaf:name'), Literal('nameEN', lang='en'))
+            self.assertEquals(Literal('altLabelEN', lang='en'), g.findLabel(uri='u:ri'))
+            g.removeTriple('u:ri', curieToUri('skos:altLabel'), Literal('altLabelEN', lang='en'))
+            self.assertEquals([None, Literal('label2')], g.findLabels(['u:ri', 'u:ri2']))
+            self.assertEquals([None, Literal('label2')], g.findLabels(['u:ri', 'u:ri2'], languages=['en', None]))
+
     def testMatchTriplePathRealRdfTriples(self):
         # Note: at the moment we follow the convention that only (for performance reasons) the triple's object is wrapped in Literal, Uri or BNode.
         # All variable bindings get wrapped.
@@ -197,3 +363,138 @@ class GraphTest(SeecrTestCase):
                 ('?v1', None, '?v2'),
                 ('?v2', None, '?v0'),
                 ('?v0', None, Literal('c')))))
+
+    def testGraphWithTermDictionary(self):
+        terms = TermDictionary()
+        g = Graph(termDictionary=terms)
+        g.addTriple('uri:x', 'uri:y', Uri('uri:z'))
+        g.addTriple('uri:x', 'uri:y', Literal('z', lang='nl'))
+        g.addTriple('uri:z', 'uri:y', BNode('_:1'))
+        self.assertEquals(set([(u'uri:x', u'uri:y', Uri('uri:z')), (u'uri:x', u'uri:y', Literal('z', lang='nl')), (u'uri:z', u'uri:y', BNode('_:1'))]), set(g.triples()))
+        self.assertEquals([(u'uri:x', u'uri:y', Uri('uri:z'))], g.triples(object=Uri('uri:z')))
+        self.assertEquals([], g.triples(object=Literal('z')))
+        self.assertEquals([], g.triples(subject='uri:unknown'))
+        self.assertEquals(set([Uri('uri:z'), Literal('z', lang='nl')]), set(g.objects(subject='uri:x', predicate='uri:y')))
+        self.assertTrue(('uri:x', 'uri:y', Uri('uri:z')) in g)
+        self.assertTrue((None, None, BNode('_:1')) in g)
+        self.assertFalse(('uri:x', 'uri:y', Uri('uri:unknown')) in g)
+        self.assertEquals([{'s': Uri('uri:x'), 'o': Uri('uri:z')}], list(g.matchTriplePatterns(('?s', 'uri:y', '?o'), ('?o', 'uri:y', BNode('_:1')))))
+
+        self.assertEquals(6, len(terms))  # Whitebox: every term stored once
+        self.assertTrue(all(isinstance(termId, int) for t in g._iterIndexed(None, None, None) for termId in t))
+
+        g.removeTriple('uri:x', 'uri:y', Uri('uri:z'))
+        g.removeTriple('uri:x', 'uri:y', Uri('uri:unknown'))
+        self.assertEquals(2, len(g.triples()))
+        self.assertFalse(('uri:x', 'uri:y', Uri('uri:z')) in g)
+
+    def testTermDictionarySharedBetweenGraphs(self):
+        terms = TermDictionary()
+        g1 = Graph(termDictionary=terms)
+        g2 = Graph(termDictionary=terms)
+        g1.addTriple('uri:x', 'uri:y', Uri('uri:z'))
+        g2.addTriple('uri:x', 'uri:y', Literal('z'))
+        self.assertEquals(4, len(terms))
+        self.assertEquals([('uri:x', 'uri:y', Uri('uri:z'))], g1.triples())
+        self.assertEquals([('uri:x', 'uri:y', Literal('z'))], g2.triples())
+        self.assertEquals(terms.encode(Uri('uri:z')), terms.lookup(Uri('uri:z')))
+        self.assertEquals(Uri('uri:z'), terms.decode(terms.lookup(Uri('uri:z'))))
+        self.assertEquals(-1, terms.lookup(Uri('uri:unknown')))
+        self.assertEquals(None, terms.lookup(None))
+
+    def testMatchTriplePatternsReordersBySelectivity(self):
+        g = Graph()
+        for i in range(20):
+            g.addTriple('uri:item%s' % i, curieToUri('rdf:type'), Uri('uri:Type%s' % (i % 2)))
+            g.addTriple('uri:item%s' % i, curieToUri('dcterms:title'), Literal('title %s' % i))
+        g.addTriple('uri:item3', curieToUri('dcterms:creator'), Uri('uri:creator'))
+
+        patterns = [
+            ('?x', curieToUri('rdf:type'), '?t'),
+            ('?x', curieToUri('dcterms:title'), '?title'),
+            ('?x', curieToUri('dcterms:creator'), Uri('uri:creator')),
+        ]
+        plan = g.explain(*patterns)
+        self.assertEquals([patterns[2], patterns[0], patterns[1]], [pattern for pattern, _ in plan])
+        self.assertEquals([1.0, 1.0, 1.0], [estimate for _, estimate in plan])
+        self.assertEquals(
+            [dict(x=Uri('uri:item3'), t=Uri('uri:Type1'), title=Literal('title 3'))],
+            list(g.matchTriplePatterns(*patterns)))
+
+    def testMatchTriplePatternsBindingsIndependentOfPlan(self):
+        g = Graph()
+        g.addTriple('uri:a', 'uri:p', BNode('_:1'))
+        g.addTriple('_:1', 'uri:q', Literal('x'))
+        g.addTriple('uri:b', 'uri:p', Uri('uri:c'))
+        g.addTriple('uri:c', 'uri:q', Literal('y'))
+        g.addTriple('uri:c', 'uri:r', Literal('only c'))
+        self.assertEquals(
+            [dict(s=Uri('uri:a'), o=BNode('_:1')), dict(s=Uri('uri:b'), o=Uri('uri:c'))],
+            sorted(g.matchTriplePatterns(('?s', 'uri:p', '?o'), ('?o', 'uri:q', None))))
+        self.assertEquals(
+            [dict(s=Uri('uri:b'), o=Uri('uri:c'))],
+            list(g.matchTriplePatterns(('?s', 'uri:p', '?o'), ('?o', 'uri:r', None))))
+        self.assertEquals(
+            [dict(s=Uri('uri:c'), o=Uri('uri:b'))],
+            list(g.matchTriplePatterns(('?s', 'uri:r', None), ('?o', 'uri:p', '?s'))))
+
+    def testMatchTriplePatternsRepeatedVariable(self):
+        g = Graph()
+        g.addTriple('uri:a', 'uri:p', Uri('uri:a'))
+        g.addTriple('uri:a', 'uri:p', Uri('uri:b'))
+        self.assertEquals([dict(x=Uri('uri:a'))], list(g.matchTriplePatterns(('?x', 'uri:p', '?x'))))
+
+    def testMatchTriplePatternsNoPattern(self):
+        self.assertRaises(ValueError, lambda: Graph().matchTriplePatterns(('?x', 'uri:p')))
+
+    def testMatchTriplePatternsBulk(self):
+        g = Graph()
+        for i in range(30):
+            g.addTriple('uri:item%s' % i, curieToUri('rdf:type'), Uri('uri:Type%s' % (i % 3)))
+            g.addTriple('uri:item%s' % i, curieToUri('dcterms:creator'), Uri('uri:creator%s' % (i % 4)))
+            g.addTriple('uri:creator%s' % (i % 4), curieToUri('rdfs:label'), Literal('creator %s' % (i % 4)))
+        g.addTriple('_:1', curieToUri('rdfs:label'), Literal('bnode'))
+        g.addTriple('uri:item1', 'uri:p', BNode('_:1'))
+        g.addTriple('uri:item1', 'uri:p', Uri('uri:item1'))
+        for patterns in [
+                [('?x', curieToUri('rdf:type'), Uri('uri:Type1')), ('?x', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('rdfs:label'), '?l')],
+                [('?x', curieToUri('rdf:type'), '?t'), ('?y', curieToUri('rdf:type'), '?t')],
+                [(None, None, '?v'), ('?v', None, None)],
+                [('?v', None, None), (None, None, '?v')],
+                [('?x', 'uri:p', '?o'), ('?o', curieToUri('rdfs:label'), '?l')],
+                [('?x', 'uri:p', '?x')],
+                [('uri:item1', 'uri:p', BNode('_:1'))],
+                [('uri:item1', 'uri:p', BNode('_:2'))],
+                [('?x', 'uri:unknown', '?y'), ('?x', curieToUri('rdf:type'), '?t')],
+            ]:
+            expected = sorted(g.matchTriplePatterns(*patterns))
+            self.assertEquals(expected, sorted(g.matchTriplePatterns(*patterns, bulk=True)), patterns)
+        self.assertEquals(300, len(list(g.matchTriplePatterns(('?x', curieToUri('rdf:type'), '?t'), ('?y', curieToUri('rdf:type'), '?t'), bulk=True))))
+        self.assertEquals(30, len(list(g.matchTriplePatterns((None, curieToUri('rdf:type'), '?t'), bulk=True, distinct=False))))
+        self.assertEquals(30, len(list(g.matchTriplePatterns((None, curieToUri('rdf:type'), '?t'), distinct=False))))
+        self.assertEquals(3, len(list(g.matchTriplePatterns((None, curieToUri('rdf:type'), '?t'), bulk=True))))
+
+    def testPrepare(self):
+        g = Graph()
+        for i in range(10):
+            g.addTriple('uri:item%s' % i, curieToUri('dcterms:creator'), Uri('uri:creator%s' % (i % 2)))
+            g.addTriple('uri:item%s' % i, curieToUri('dcterms:title'), Literal('title %s' % i))
+        g.addTriple('uri:creator0', curieToUri('rdfs:label'), Literal('Creator'))
+
+        query = g.prepare(('?item', curieToUri('dcterms:creator'), '?creator'), ('?creator', curieToUri('rdfs:label'), '?label'))
+        self.assertEquals([dict(item=Uri('uri:item2'), creator=Uri('uri:creator0'), label=Literal('Creator'))], list(query.match(dict(item=Uri('uri:item2')))))
+        self.assertEquals([], list(query.match(dict(item=Uri('uri:item3')))))
+        self.assertEquals([], list(query.match(dict(item=Uri('uri:unknown')), bulk=True)))
+        self.assertEquals(5, len(list(query.match())))
+        self.assertEquals(5, len(list(query.match(bulk=True))))
+
+        self.assertEquals(curieToUri('dcterms:creator'), query.explain(boundVariables=['item'])[0][0][1])
+        self.assertEquals(curieToUri('rdfs:label'), query.explain()[0][0][1])
+        plan = query._plan(g, frozenset(['item']))  # Whitebox: plans are cached per set of bound variables
+        self.assertTrue(plan is query._plan(g, frozenset(['item'])))
+        for i in range(10, 40):
+            g.addTriple('uri:item%s' % i, curieToUri('dcterms:title'), Literal('title %s' % i))
+        self.assertFalse(plan is query._plan(g, frozenset(['item'])))
+
+        g.addTriple('uri:creator1', curieToUri('rdfs:label'), Literal('Other'))
+        self.assertEquals([dict(item=Uri('uri:item3'), creator=Uri('uri:creator1'), label=Literal('Other'))], list(query.match(dict(item=Uri('uri:item3')))))
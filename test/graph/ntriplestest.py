@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+
+from StringIO import StringIO
+from os.path import join
+
+from lxml.etree import XML
+
+from meresco.rdf.graph import NTriplesParser, RDFParser, Graph, Uri, BNode, Literal, loadNTriples, asNTriples
+
+
+class NTriplesParserTest(SeecrTestCase):
+    def testTerms(self):
+        graph = NTriplesParser().parseStream(StringIO(NTRIPLES))
+        self.assertEquals(sorted([
+                (u'http://example.org/a', u'http://purl.org/dc/terms/title', Literal(u'Title', lang=u'en')),
+                (u'http://example.org/a', u'http://purl.org/dc/terms/creator', BNode(u'_:b1')),
+                (u'_:b1', u'http://www.w3.org/1999/02/22-rdf-syntax-ns#type', Uri(u'http://xmlns.com/foaf/0.1/Person')),
+                (u'_:b1', u'http://www.w3.org/2000/01/rdf-schema#label', Literal(u'Jan "de" Vries\n\t€ \U0001F600 \\')),
+                (u'_:b1', u'http://schema.org/birthDate', Literal(u'1970')),
+                (u'http://example.org/bé', u'http://purl.org/dc/terms/title', Literal(u'Geïllustreerd', lang=u'nl-NL')),
+                (u'http://example.org/bé', u'http://purl.org/dc/terms/description', Literal(u'')),
+            ]), sorted(graph.triples()))
+
+    def testSameTermsAsRDFParser(self):
+        rdfXml = RDFParser().parse(XML(RDF_XML))
+        nTriples = NTriplesParser(sink=Graph()).parseStream(StringIO(NTRIPLES_FOR_RDF_XML))
+        self.assertEquals(sorted(rdfXml.triples()), sorted(nTriples.triples()))
+
+    def testInvalidLine(self):
+        parser = NTriplesParser()
+        try:
+            parser.parseStream(StringIO('<uri:a> <uri:p> <uri:o> .\n<uri:a> <uri:p> "no end .\n'))
+            self.fail()
+        except ValueError, e:
+            self.assertTrue('line 2' in str(e), str(e))
+
+    def testParseRange(self):
+        data = '<uri:a> <uri:p> "1" .\n<uri:b> <uri:p> "2" .\n<uri:c> <uri:p> "3" .\n'
+        lineLength = len(data) / 3
+        def subjects(start, end):
+            return sorted(s for s, _, _ in NTriplesParser().parseRange(StringIO(data), start, end).triples())
+        self.assertEquals(['uri:a'], subjects(0, lineLength))
+        self.assertEquals(['uri:a', 'uri:b'], subjects(0, lineLength + 1))
+        self.assertEquals(['uri:b'], subjects(1, lineLength + 1))
+        self.assertEquals(['uri:b', 'uri:c'], subjects(lineLength, len(data)))
+        self.assertEquals([], subjects(len(data) - 1, len(data)))
+
+    def testLoadNTriples(self):
+        path = join(self.tempdir, 'data.nt')
+        with open(path, 'w') as f:
+            for i in xrange(100):
+                f.write('<uri:r%s> <uri:p> _:node%s .\n' % (i, i % 10))
+                f.write('_:node%s <uri:label> "label %s" .\n' % (i % 10, i % 10))
+        for processes in [1, 3]:
+            graph = Graph()
+            statistics = loadNTriples(path, graph, processes=processes, chunkSize=500)
+            self.assertEquals(200, statistics['triples'])
+            self.assertTrue(statistics['chunks'] > 10, statistics)
+            self.assertTrue(statistics['triplesPerSecond'] > 0)
+            self.assertEquals(110, graph.count())
+            nodes = set(o for s, p, o in graph.triples(predicate='uri:p'))
+            self.assertEquals(10, len(nodes))
+            for node in nodes:
+                self.assertTrue(node.isBNode())
+                self.assertEquals(1, graph.count(subject=node.value))
+
+        loadNTriples(path, graph)
+        self.assertEquals(220, graph.count())
+
+    def testAsNTriples(self):
+        graph = Graph()
+        graph.addTriple('uri:a', 'uri:p', Literal(u'Jan "de" Vries\r\n\\ \u20ac', lang='nl'))
+        graph.addTriple('uri:a', 'uri:p', Uri('uri:with space>'))
+        graph.addTriple('uri:a', 'uri:p', BNode('_:b1'))
+        graph.addTriple('_:b1', 'uri:p', Literal(''))
+        self.assertEquals([
+                '<uri:a> <uri:p> "Jan \\"de\\" Vries\\r\\n\\\\ \xe2\x82\xac"@nl .',
+                '<uri:a> <uri:p> <uri:with\\u0020space\\u003E> .',
+                '<uri:a> <uri:p> _:b1 .',
+                '_:b1 <uri:p> "" .',
+            ], sorted(''.join(asNTriples(graph)).splitlines()))
+        self.assertEquals(sorted(graph.triples()), sorted(NTriplesParser().parseStream(StringIO(''.join(asNTriples(graph)))).triples()))
+
+    def testAsNTriplesInChunks(self):
+        triples = [('uri:s%s' % i, 'uri:p', Literal(str(i))) for i in range(5)]
+        chunks = list(asNTriples(iter(triples), linesPerChunk=2))
+        self.assertEquals([2, 2, 1], [len(chunk.splitlines()) for chunk in chunks])
+        self.assertTrue(all(isinstance(chunk, str) for chunk in chunks))
+
+    def testAsNQuads(self):
+        self.assertEquals('<uri:s> <uri:p> "o" <uri:g> .\n', ''.join(asNTriples([('uri:s', 'uri:p', Literal('o'))], context='uri:g')))
+        self.assertEquals('<uri:s> <uri:p> "o" _:g .\n', ''.join(asNTriples([('uri:s', 'uri:p', Literal('o'), BNode('_:g'))])))
+
+
+NTRIPLES = r'''# a comment
+<http://example.org/a> <http://purl.org/dc/terms/title> "Title"@en .
+<http://example.org/a> <http://purl.org/dc/terms/creator> _:b1 .
+
+_:b1 <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://xmlns.com/foaf/0.1/Person> . # trailing comment
+_:b1 <http://www.w3.org/2000/01/rdf-schema#label> "Jan \"de\" Vries\n\t€ \U0001F600 \\" .
+_:b1 <http://schema.org/birthDate> "1970"^^<http://www.w3.org/2001/XMLSchema#gYear> .
+<http://example.org/bé> <http://purl.org/dc/terms/title> "Geïllustreerd"@nl-NL .
+<http://example.org/bé> <http://purl.org/dc/terms/description> "".
+'''
+
+RDF_XML = '''<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns:dcterms="http://purl.org/dc/terms/">
+    <rdf:Description rdf:about="http://example.org/a">
+        <dcterms:title xml:lang="en">Title</dcterms:title>
+        <dcterms:creator rdf:nodeID="creator"/>
+        <dcterms:subject rdf:resource="http://example.org/s"/>
+    </rdf:Description>
+</rdf:RDF>'''
+
+NTRIPLES_FOR_RDF_XML = '''<http://example.org/a> <http://purl.org/dc/terms/title> "Title"@en .
+<http://example.org/a> <http://purl.org/dc/terms/creator> _:creator .
+<http://example.org/a> <http://purl.org/dc/terms/subject> <http://example.org/s> .
+'''
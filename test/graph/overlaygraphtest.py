@@ -0,0 +1,117 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+from seecr.test.io import stdout_replaced
+
+from os.path import join
+
+from meresco.xml.namespaces import curieToUri
+from meresco.rdf.graph import Graph, OverlayGraph, Literal, Uri, BNode, TermDictionary, Triples2RdfXml, GraphComponent, asNTriples
+
+
+class OverlayGraphTest(SeecrTestCase):
+    def setUp(self):
+        SeecrTestCase.setUp(self)
+        self.base = Graph()
+        self.base.addTriple('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en'))
+        self.base.addTriple('uri:a', curieToUri('dcterms:creator'), Uri('uri:c'))
+        self.base.addTriple('uri:c', curieToUri('rdfs:label'), Literal('creator'))
+
+    def testReadsMergeWithBase(self):
+        overlay = OverlayGraph(self.base)
+        overlay.addTriple('uri:a', curieToUri('skos:prefLabel'), Literal('etiket', lang='nl'))
+        overlay.addTriple('uri:c', curieToUri('rdfs:label'), Literal('creator'))
+        overlay.removeTriple('uri:a', curieToUri('dcterms:creator'), Uri('uri:c'))
+        overlay.removeTriple('uri:x', curieToUri('dcterms:creator'), Uri('uri:c'))
+
+        self.assertEquals(3, overlay.count())
+        self.assertEquals(3, self.base.count())
+        self.assertEquals(sorted([
+                ('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en')),
+                ('uri:a', curieToUri('skos:prefLabel'), Literal('etiket', lang='nl')),
+                ('uri:c', curieToUri('rdfs:label'), Literal('creator')),
+            ]), sorted(overlay.triples()))
+        self.assertEquals(2, overlay.count(subject='uri:a'))
+        self.assertEquals([], overlay.objects('uri:a', curie='dcterms:creator'))
+        self.assertEquals(Literal('etiket', lang='nl'), overlay.findLabel('uri:a'))
+        self.assertEquals(Literal('a', lang='en'), self.base.findLabel('uri:a'))
+        self.assertFalse(('uri:a', curieToUri('dcterms:creator'), Uri('uri:c')) in overlay)
+        self.assertTrue(('uri:a', curieToUri('skos:prefLabel'), Literal('etiket', lang='nl')) in overlay)
+
+        overlay.addTriple('uri:a', curieToUri('dcterms:creator'), Uri('uri:c'))
+        self.assertEquals(
+            [dict(c=Uri('uri:c'), l=Literal('creator'))],
+            list(overlay.matchTriplePatterns(('uri:a', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('rdfs:label'), '?l'))))
+        overlay.removeTriple('uri:a', curieToUri('skos:prefLabel'), Literal('etiket', lang='nl'))
+        self.assertEquals(sorted(self.base.triples()), sorted(overlay.triples()))
+
+    def testSerialize(self):
+        overlay = OverlayGraph(self.base)
+        overlay.addTriple('uri:a', curieToUri('dcterms:subject'), BNode('_:1'))
+        overlay.addTriple('_:1', curieToUri('rdfs:label'), Literal('subject'))
+        rdfXml = Triples2RdfXml().asRdfXml(overlay)
+        self.assertEquals(1, len(rdfXml.xpath('//rdfs:label[text()="subject"]', namespaces={'rdfs': curieToUri('rdfs:')})))
+
+    def testCommit(self):
+        base = Graph(termDictionary=TermDictionary())
+        base.addTriples(self.base.triples())
+        overlay = OverlayGraph(base)
+        overlay.addTriple('uri:b', curieToUri('rdfs:label'), Literal('b'))
+        overlay.removeTriple('uri:c', curieToUri('rdfs:label'), Literal('creator'))
+        expected = sorted(overlay.triples())
+        overlay.commit()
+        self.assertEquals(expected, sorted(base.triples()))
+        self.assertEquals(expected, sorted(overlay.triples()))
+        self.assertEquals(3, overlay.count())
+
+    def testCommitRequiresMutableBase(self):
+        overlay = OverlayGraph(self.base.freeze())
+        overlay.addTriple('uri:b', curieToUri('rdfs:label'), Literal('b'))
+        self.assertEquals(4, overlay.count())
+        self.assertRaises(RuntimeError, overlay.commit)
+
+    def testGraphComponentAsBase(self):
+        path = join(self.tempdir, 'labels.nt')
+        with open(path, 'w') as f:
+            f.write(''.join(asNTriples(self.base.triples())))
+        with stdout_replaced():
+            component = GraphComponent(rdfSources=[path], freeze=True)
+        overlay = OverlayGraph(component)
+        overlay.addTriple('uri:b', curieToUri('rdfs:label'), Literal('b'))
+        overlay.addTriple('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en'))
+        overlay.removeTriple('uri:c', curieToUri('rdfs:label'), Literal('creator'))
+        self.assertEquals(3, overlay.count())
+        self.assertEquals(3, component.count())
+        self.assertEquals(Literal('b'), overlay.findLabel('uri:b'))
+        self.assertEquals(None, overlay.findLabel('uri:c'))
+        self.assertTrue(('uri:a', curieToUri('rdfs:label'), Literal('a', lang='en')) in overlay)
+        self.assertFalse(('uri:c', curieToUri('rdfs:label'), Literal('creator')) in overlay)
+
+        with stdout_replaced():
+            component = GraphComponent(rdfSources=[path])
+        overlay = OverlayGraph(component)
+        overlay.addTriple('uri:b', curieToUri('rdfs:label'), Literal('b'))
+        overlay.commit()
+        self.assertEquals(Literal('b'), component.findLabel('uri:b'))
@@ -0,0 +1,90 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+
+from meresco.rdf.graph import QuadGraph, Literal, Uri, BNode, TermDictionary, asNTriples
+
+
+class QuadGraphTest(SeecrTestCase):
+    def testContexts(self):
+        g = QuadGraph()
+        g.addQuad('uri:a', 'uri:p', Literal('a'), 'file:one.rdf')
+        g.addQuad('uri:a', 'uri:p', Literal('shared'), 'file:one.rdf')
+        g.addQuad('uri:b', 'uri:p', Literal('b'), 'file:two.rdf')
+        g.addQuad('uri:a', 'uri:p', Literal('shared'), 'file:two.rdf')
+        g.addTriple('uri:c', 'uri:p', Uri('uri:a'))
+
+        self.assertEquals(set(['file:one.rdf', 'file:two.rdf', None]), set(g.contexts()))
+        self.assertEquals(4, g.count())
+        self.assertEquals(2, g.count(subject='uri:a'))
+        self.assertEquals(sorted([('uri:a', 'uri:p', Literal('a')), ('uri:a', 'uri:p', Literal('shared'))]), sorted(g.triples(context='file:one.rdf')))
+        self.assertEquals([('uri:b', 'uri:p', Literal('b'))], g.triples(subject='uri:b', context='file:two.rdf'))
+        self.assertEquals([], g.triples(subject='uri:b', context='file:one.rdf'))
+        self.assertEquals([('uri:c', 'uri:p', Uri('uri:a'))], g.triples(context=None))
+        self.assertEquals(0, g.count(context='unknown'))
+        self.assertEquals(sorted([('uri:a', 'uri:p', Literal('shared'), 'file:one.rdf'), ('uri:a', 'uri:p', Literal('shared'), 'file:two.rdf')]),
+            sorted(g.quads(object=Literal('shared'))))
+        self.assertEquals(2, len(list(g.matchTriplePatterns(('?s', 'uri:p', Uri('uri:a')), ('uri:a', 'uri:p', '?o')))))
+        self.assertEquals([Literal('a'), None], g.findLabels(['uri:a', 'uri:c'], labelPredicates=['uri:p']))
+
+        g.removeContext('file:one.rdf')
+        self.assertEquals(set(['file:two.rdf', None]), set(g.contexts()))
+        self.assertEquals(Literal('shared'), g.findLabel('uri:a', labelPredicates=['uri:p']))
+        self.assertEquals(sorted([
+                ('uri:a', 'uri:p', Literal('shared')),
+                ('uri:b', 'uri:p', Literal('b')),
+                ('uri:c', 'uri:p', Uri('uri:a')),
+            ]), sorted(g.triples()))
+        self.assertTrue(('uri:a', 'uri:p', Literal('shared')) in g)
+        self.assertFalse(('uri:a', 'uri:p', Literal('a')) in g)
+
+        g.removeQuad('uri:a', 'uri:p', Literal('shared'), 'file:two.rdf')
+        self.assertFalse(('uri:a', 'uri:p', Literal('shared')) in g)
+        g.removeTriple('uri:b', 'uri:p', Literal('b'))
+        self.assertEquals([None], g.contexts())
+        self.assertEquals(1, g.count())
+
+    def testAddTriplesAndBulkLoader(self):
+        g = QuadGraph(termDictionary=TermDictionary())
+        g.addTriples([('uri:a', 'uri:p', Literal('a')), ('uri:a', 'uri:p', Literal('a'))], context='one')
+        with g.bulkLoader(context='two') as loader:
+            loader.addTriple('uri:a', 'uri:p', Literal('a'))
+            loader.addTriple('uri:b', 'uri:p', BNode('_:1'))
+        g.addTriples([('uri:a', 'uri:p', Literal('a'))], context='three')
+        g.addTriples([], context='four')
+        self.assertEquals(['one', 'three', 'two'], sorted(g.contexts()))
+        self.assertEquals(2, g.count())
+        g.removeContext('one')
+        g.removeContext('two')
+        self.assertEquals([('uri:a', 'uri:p', Literal('a'))], g.triples())
+        g.removeContext('three')
+        self.assertEquals([], g.triples())
+        self.assertEquals([], g.contexts())
+
+    def testAsNQuads(self):
+        g = QuadGraph()
+        g.addQuad('uri:a', 'uri:p', Literal('a'), 'uri:g')
+        g.addTriple('uri:a', 'uri:p', Literal('b'))
+        self.assertEquals(['<uri:a> <uri:p> "a" <uri:g> .', '<uri:a> <uri:p> "b" .'], sorted(''.join(asNTriples(g.quads())).splitlines()))
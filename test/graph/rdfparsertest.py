@@ -33,6 +33,7 @@ from meresco.xml.namespaces import namespaces, curieToUri
 from os.path import join, dirname, abspath
 
 from lxml.etree import XML, parse
+from StringIO import StringIO
 
 from meresco.rdf.graph.rdfparser import RDFParser, getText
 from meresco.rdf.graph import Uri, Literal, BNode, Graph
@@ -117,6 +118,35 @@ class RdfParserTest(SeecrTestCase):
 
         self.assertTrue(('http://purl.org/ontology/mo/Track', 'http://www.w3.org/2000/01/rdf-schema#subClassOf', Uri('http://dbpedia.org/ontology/MusicalWork')) in set(self.sink.triples()))
 
+    def testParseStream(self):
+        for data in [INPUT_RDF, RDF_WITH_BASE, open(join(testDatadir, 'nl_property_labels.rdf')).read()]:
+            BNode.nextGenId = 0
+            expected = RDFParser().parse(XML(data))
+            BNode.nextGenId = 0
+            graph = RDFParser(sink=self.sink).parseStream(StringIO(data))
+            self.assertTrue(graph is self.sink)
+            self.assertEquals(sorted(expected.triples()), sorted(self.sink.triples()))
+            self.sink = Graph()
+
+    def testParseStreamNodeWithoutRdfContainer(self):
+        xml = '''<owl:Class %(xmlns_rdf)s %(xmlns_rdfs)s %(xmlns_owl)s rdf:about="http://purl.org/ontology/mo/Track">
+            <rdfs:label>track</rdfs:label>
+        </owl:Class>''' % namespaces
+        RDFParser(sink=self.sink).parseStream(StringIO(xml))
+        self.assertEquals([Uri(namespaces.owl + 'Class')], list(self.sink.objects(subject='http://purl.org/ontology/mo/Track', curie='rdf:type')))
+
+    def testParseStreamClearsProcessedNodes(self):
+        positions = []
+        parser = RDFParser(sink=Graph())
+        nodeElement = parser.nodeElement
+        def recordingNodeElement(e):
+            positions.append((e.getparent().index(e), len(e.getparent()[0])))
+            return nodeElement(e)
+        parser.nodeElement = recordingNodeElement
+        parser.parseStream(StringIO(RDF_MANY_NODES))
+        self.assertEquals([(0, 1), (1, 0), (1, 0), (1, 0), (1, 0)], positions)
+        self.assertEquals(5, parser._sink.count())
+
     def testEmptyPropertyAttribs(self):
         RDFParser(sink=self.sink).parse(XML(INPUT_RDF))
         relationBnode = self.sink.objects(subject=uri, curie='dcterms:relation')[0]
@@ -284,6 +314,9 @@ INPUT_RDF = """
     </rdf:Description>
 </rdf:RDF>""" % namespaces
 
+RDF_MANY_NODES = '''<rdf:RDF %%(xmlns_rdf)s %%(xmlns_rdfs)s>%s</rdf:RDF>''' % ''.join(
+    '<rdf:Description rdf:about="uri:%s"><rdfs:label>%s</rdfs:label></rdf:Description>' % (i, i) for i in range(5)) % namespaces
+
 RDF_WITH_BASE = """<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xml:base="http://example.org/base/">
     <rdf:Description rdf:about="2">
         <rdf:type rdf:resource="Book"/>
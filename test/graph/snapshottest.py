@@ -0,0 +1,97 @@
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from seecr.test import SeecrTestCase
+
+from os import listdir
+from os.path import join
+
+from meresco.rdf.graph import Graph, FrozenGraph, Literal, Uri, BNode, writeSnapshot, openSnapshot, snapshotMetadata
+
+
+class SnapshotTest(SeecrTestCase):
+    def testWriteAndOpen(self):
+        g = Graph()
+        for s in ['x', '1']:
+            for p in ['y', '2']:
+                for o in [Uri('z'), Literal('3'), Literal(u'\u20ac', lang='nl'), BNode('_:4')]:
+                    g.addTriple(s, p, o)
+        path = join(self.tempdir, 'graph.snapshot')
+        writeSnapshot(g, path)
+        snapshot = openSnapshot(path)
+        self.assertTrue(isinstance(snapshot, FrozenGraph))
+        for s in [None, 'x', '1', 'unknown']:
+            for p in [None, 'y', '2', 'unknown']:
+                for o in [None, Uri('z'), Literal('3'), Literal(u'\u20ac', lang='nl'), Literal(u'\u20ac'), BNode('_:4'), Literal('z'), Uri('unknown')]:
+                    self.assertEquals(sorted(g.triples(s, p, o)), sorted(snapshot.triples(s, p, o)), (s, p, o))
+                    self.assertEquals(g.count(s, p, o), snapshot.count(s, p, o), (s, p, o))
+        self.assertEquals(16, snapshot.count())
+        self.assertEquals((2, 2, 4), snapshot.distinctCounts())
+        self.assertEquals(g.distinctCounts(), snapshot.distinctCounts())
+
+    def testEmptyGraph(self):
+        path = join(self.tempdir, 'graph.snapshot')
+        writeSnapshot(Graph(), path)
+        snapshot = openSnapshot(path)
+        self.assertEquals([], snapshot.triples())
+        self.assertEquals(None, snapshot.findLabel('uri:a'))
+
+    def testNotASnapshot(self):
+        path = join(self.tempdir, 'graph.snapshot')
+        open(path, 'w').write('not a snapshot')
+        self.assertRaises(ValueError, lambda: openSnapshot(path))
+        self.assertRaises(ValueError, lambda: snapshotMetadata(path))
+
+    def testMetadata(self):
+        g = Graph()
+        g.addTriple('uri:a', 'uri:p', Literal('a'))
+        path = join(self.tempdir, 'graph.snapshot')
+        writeSnapshot(g, path)
+        self.assertEquals('', snapshotMetadata(path))
+        writeSnapshot(g, path, metadata='{"sources": ["a.nt"]}\0')
+        self.assertEquals('{"sources": ["a.nt"]}\0', snapshotMetadata(path))
+        self.assertEquals([('uri:a', 'uri:p', Literal('a'))], openSnapshot(path).triples())
+
+    def testTruncatedSnapshot(self):
+        g = Graph()
+        for i in xrange(10):
+            g.addTriple('uri:s%s' % i, 'uri:p', Literal('value %s' % i))
+        path = join(self.tempdir, 'graph.snapshot')
+        writeSnapshot(g, path)
+        data = open(path, 'rb').read()
+        for size in [len(data) - 1, len(data) - 40, 100, 60, 20, 9]:
+            open(path, 'wb').write(data[:size])
+            self.assertRaises(ValueError, lambda: openSnapshot(path))
+        open(path, 'wb').write(data + '\0' * 4)
+        self.assertRaises(ValueError, lambda: openSnapshot(path))
+
+    def testWriteLeavesNoTemporaryFiles(self):
+        g = Graph()
+        g.addTriple('uri:a', 'uri:p', Literal('a'))
+        path = join(self.tempdir, 'graph.snapshot')
+        writeSnapshot(g, path)
+        writeSnapshot(g, path)
+        self.assertEquals(['graph.snapshot'], listdir(self.tempdir))
+        self.assertRaises(TypeError, lambda: writeSnapshot(g, path, metadata=None))
+        self.assertEquals(['graph.snapshot'], listdir(self.tempdir))
@@ -247,6 +247,63 @@ class Triples2RdfXmlTest(SeecrTestCase):
         self.assertEquals(['rdf:Description', 'rdf:Statement'], [tagToCurie(node.tag) for node in xpath(result, '/rdf:RDF/*')])
         self.assertXmlEquals(rdfXml, result)
 
+    def testAsRdfXmlStream(self):
+        testNamespaces = namespaces.copyUpdate(dict(test="urn:test#"))
+        graph = RDFParser().parse(XML('''<rdf:RDF %(xmlns_rdf)s %(xmlns_rdfs)s %(xmlns_dcterms)s %(xmlns_oa)s %(xmlns_test)s>
+            <oa:Annotation rdf:about="uri:a">
+                <oa:hasBody>
+                    <rdf:Description>
+                        <dcterms:source rdf:resource="uri:source"/>
+                        <dcterms:title xml:lang="en">Title &amp; &lt;more&gt; "quoted"\r</dcterms:title>
+                    </rdf:Description>
+                </oa:hasBody>
+                <oa:hasTarget rdf:resource="uri:target?a=1&amp;b=&quot;2&quot;"/>
+                <dcterms:related rdf:nodeID="abc"/>
+            </oa:Annotation>
+            <rdf:Description rdf:about="uri:source">
+                <rdfs:label>A Source</rdfs:label>
+                <dcterms:related rdf:nodeID="abc"/>
+                <test:relation rdf:ID="_987">object</test:relation>
+            </rdf:Description>
+            <rdf:Description rdf:nodeID="abc">
+                <rdfs:label>ABC</rdfs:label>
+            </rdf:Description>
+            <rdf:Statement rdf:about="#_987">
+                <test:reificationRelation>reification object</test:reificationRelation>
+            </rdf:Statement>
+        </rdf:RDF>''' % testNamespaces))
+        for triples2RdfXml in [
+                Triples2RdfXml(namespaces=testNamespaces),
+                Triples2RdfXml(namespaces=testNamespaces, inlineDescriptions=True),
+                Triples2RdfXml(namespaces=testNamespaces, knownTypes=['rdf:Statement'], relativeTypePositions={curieToUri('oa:Annotation'): 10})]:
+            tree = triples2RdfXml.asRdfXml(graph)
+            chunks = list(triples2RdfXml.asRdfXmlStream(graph))
+            self.assertTrue(all(isinstance(chunk, str) for chunk in chunks))
+            streamed = XML(''.join(chunks))
+            self.assertEquals(len(streamed) + 1, len(chunks))
+            self.assertEquals(tree.nsmap, streamed.nsmap)
+            self.assertXmlEquals(tree, streamed)
+        self.assertEquals('<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"></rdf:RDF>', ''.join(Triples2RdfXml().asRdfXmlStream([])))
+
+    def testAsRdfXmlMany(self):
+        testNamespaces = namespaces.copyUpdate(dict(test="urn:test#"))
+        triples2RdfXml = Triples2RdfXml(namespaces=testNamespaces, knownTypes=['test:Thing'])
+        records = []
+        for i in range(5):
+            graph = Graph()
+            graph.addTriple('uri:%s' % i, curieToUri('rdf:type'), Uri('urn:test#Thing'))
+            graph.addTriple('uri:%s' % i, 'urn:test#number', Literal(str(i)))
+            records.append(graph)
+        records.append([('uri:5', 'urn:test#number', Literal('5'))])
+        for workers in [1, 2]:
+            result = triples2RdfXml.asRdfXmlMany(records, workers=workers)
+            self.assertEquals(6, len(result))
+            for i, rdfXml in enumerate(result):
+                self.assertTrue(isinstance(rdfXml, str))
+                self.assertXmlEquals(triples2RdfXml.asRdfXml(records[i]), rdfXml)
+            self.assertEquals(['uri:0', 'test:Thing'], [testNamespaces.xpathFirst(XML(result[0]), '/rdf:RDF/*/@rdf:about'), testNamespaces.tagToCurie(XML(result[0])[0].tag)])
+        self.assertEquals([], triples2RdfXml.asRdfXmlMany([], workers=2))
+
     def testTopLevelBNode(self):
         rdfXml = '''<rdf:RDF %(xmlns_rdf)s %(xmlns_dcterms)s>
             <rdf:Description>
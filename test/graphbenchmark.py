@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+## begin license ##
+#
+# Meresco RDF contains components to handle RDF data.
+#
+# Copyright (C) 2026 Seecr (Seek You Too B.V.) http://seecr.nl
+#
+# This file is part of "Meresco RDF"
+#
+# "Meresco RDF" is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# "Meresco RDF" is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with "Meresco RDF"; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+#
+## end license ##
+
+from os import system                            #DO_NOT_DISTRIBUTE
+system('find .. -name "*.pyc" | xargs rm -f')    #DO_NOT_DISTRIBUTE
+from seecrdeps import includeParentAndDeps       #DO_NOT_DISTRIBUTE
+includeParentAndDeps(__file__)                   #DO_NOT_DISTRIBUTE
+
+from sys import argv
+from time import time
+from collections import defaultdict
+from threading import Thread
+
+from meresco.xml.namespaces import curieToUri
+from meresco.rdf.graph import Graph, ConcurrentGraph, TermDictionary, Uri, Literal, BNode
+from meresco.rdf.graph._utils import unique
+
+
+class PowersetIndexGraph(object):
+    """The former Graph layout; every triple stored under all 8 (s, p, o) masks."""
+
+    def __init__(self):
+        self._tripleDict = defaultdict(set)
+
+    def addTriple(self, subject, predicate, object):
+        t = (subject, predicate, object)
+        for s in [None, subject]:
+            for p in [None, predicate]:
+                for o in [None, object]:
+                    self._tripleDict[(s, p, o)].add(t)
+
+    def removeTriple(self, subject, predicate, object):
+        t = (subject, predicate, object)
+        for s in [None, subject]:
+            for p in [None, predicate]:
+                for o in [None, object]:
+                    tripleSet = self._tripleDict.get((s, p, o))
+                    if tripleSet is None:
+                        continue
+                    tripleSet.discard(t)
+                    if not tripleSet:
+                        del self._tripleDict[(s, p, o)]
+
+    def triples(self, subject=None, predicate=None, object=None):
+        return list(self._tripleDict.get((subject, predicate, object), []))
+
+
+def nestedLoopMatch(graph, *triplePatterns):
+    """The former matchTriplePatterns: patterns matched in the given order, without planning."""
+    def matchRecursive(patterns, bindings):
+        if not patterns:
+            yield bindings
+            return
+        pattern, patternsTail = patterns[0], patterns[1:]
+        tripleMask = list(pattern)
+        variables = {}
+        for i, value in enumerate(pattern):
+            if hasattr(value, 'startswith') and value.startswith('?'):
+                variables[i] = value[1:]
+                binding = bindings.get(value[1:])
+                tripleMask[i] = getattr(binding, 'value', binding) if i < 2 else binding
+        for triple in graph.triples(*tripleMask):
+            newBindings = dict(bindings)
+            for i, value in enumerate(triple):
+                variable = variables.get(i)
+                if not variable is None:
+                    newBindings[variable] = Uri(value) if i < 2 else value
+            for result in matchRecursive(patternsTail, newBindings):
+                yield result
+    return unique(matchRecursive(triplePatterns, {}), key=lambda d: tuple(sorted(d.items())))
+
+
+def createTriples(size):
+    predicates = [u'http://example.org/p%s' % i for i in xrange(20)]
+    triples = []
+    for i in xrange(size):
+        subject = u'http://example.org/s%s' % (i // 10)
+        predicate = predicates[i % len(predicates)]
+        if i % 2:
+            object = Uri(u'http://example.org/s%s' % ((i * 7) // 10))
+        else:
+            object = Literal(u'value %s' % i, lang='nl')
+        triples.append((subject, predicate, object))
+    return triples
+
+def timed(f, *args):
+    t0 = time()
+    f(*args)
+    return time() - t0
+
+def benchmark(createGraph, triples, deferIndexing=False):
+    graph = createGraph()
+    def add():
+        if deferIndexing:
+            graph.addTriples(triples, deferIndexing=True)
+            return
+        for s, p, o in triples:
+            graph.addTriple(s, p, o)
+    def lookup():
+        for s, p, o in triples[::10]:
+            graph.triples(subject=s)
+            graph.triples(subject=s, predicate=p)
+            graph.triples(predicate=p, object=o)
+            graph.triples(object=o)
+            graph.triples(subject=s, predicate=p, object=o)
+    def remove():
+        for s, p, o in triples:
+            graph.removeTriple(s, p, o)
+    return timed(add), timed(lookup), timed(remove)
+
+def concurrentLookups(graph, triples, readers, bulkLoad=None):
+    lookups = triples[::10]
+    def lookup():
+        for s, p, o in lookups:
+            graph.triples(subject=s)
+            graph.triples(predicate=p, object=o)
+    threads = [Thread(target=lookup) for _ in xrange(readers)]
+    if bulkLoad is not None:
+        threads.append(Thread(target=graph.addTriples, args=(bulkLoad,), kwargs=dict(deferIndexing=True)))
+    t0 = time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return readers * len(lookups) * 2 / (time() - t0)
+
+def mainConcurrent(size):
+    triples = createTriples(size)
+    print
+    print "%-30s %15s %15s %22s" % ('lookups/s', '1 reader', '4 readers', '4 readers + bulk load')
+    for name, createGraph in [('Graph (unsynchronized)', Graph), ('ConcurrentGraph', ConcurrentGraph)]:
+        results = []
+        for readers, bulkLoad in [(1, None), (4, None), (4, createTriples(size * 2)[size:])]:
+            graph = createGraph()
+            graph.addTriples(triples, deferIndexing=True)
+            if bulkLoad is not None and not isinstance(graph, ConcurrentGraph):
+                results.append('n/a')  # Graph does not support reads during writes
+                continue
+            results.append('%.0f' % concurrentLookups(graph, triples, readers, bulkLoad=bulkLoad))
+        print "%-30s %15s %15s %22s" % ((name,) + tuple(results))
+
+def mainPatterns(iterations):
+    graph = Graph()
+    for i in xrange(10):
+        subject = 'uri:record%s' % i
+        graph.addTriple(subject, curieToUri('dcterms:title'), Literal('title %s' % i))
+        graph.addTriple(subject, curieToUri('dcterms:creator'), Uri('uri:creator%s' % (i % 3)))
+        statement = BNode('_:statement%s' % i)
+        graph.addTriple(statement.value, curieToUri('rdf:subject'), Uri(subject))
+        graph.addTriple(statement.value, curieToUri('rdf:predicate'), Uri(curieToUri('dcterms:title')))
+        graph.addTriple(statement.value, curieToUri('rdf:object'), Literal('title %s' % i))
+    for i in xrange(3):
+        graph.addTriple('uri:creator%s' % i, curieToUri('rdfs:label'), Literal('creator %s' % i))
+    queries = [
+        ('two patterns', [('?r', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('rdfs:label'), '?l')]),
+        ('no match', [('?r', curieToUri('dcterms:creator'), '?c'), ('?c', curieToUri('foaf:name'), '?l')]),
+        ('reification join', [('?r', curieToUri('rdf:subject'), '?s'), ('?r', curieToUri('rdf:predicate'), '?p'), ('?r', curieToUri('rdf:object'), '?o')]),
+    ]
+    print
+    print "%s iterations %13s %20s %10s" % (iterations, 'nested loop', 'matchTriplePatterns', 'prepared')
+    for name, patterns in queries:
+        prepared = graph.prepare(*patterns)
+        print "%-24s %12.3fs %19.3fs %9.3fs" % (
+            name,
+            timed(lambda: [list(nestedLoopMatch(graph, *patterns)) for _ in xrange(iterations)]),
+            timed(lambda: [list(graph.matchTriplePatterns(*patterns)) for _ in xrange(iterations)]),
+            timed(lambda: [list(prepared.match()) for _ in xrange(iterations)]))
+
+def listGraph(size):
+    graph = Graph()
+    graph.addTriple('uri:record', 'uri:items', BNode('_:l0'))
+    for i in xrange(size):
+        graph.addTriple('_:l%s' % i, curieToUri('rdf:first'), Literal('item %s' % i))
+        graph.addTriple('_:l%s' % i, curieToUri('rdf:rest'), BNode('_:l%s' % (i + 1)) if i + 1 < size else Uri(curieToUri('rdf:nil')))
+    return graph
+
+def identicalBNodesGraph(size):
+    graph = Graph()
+    for i in xrange(size):
+        graph.addTriple('uri:record', 'uri:creator', BNode('_:b%s' % i))
+        graph.addTriple('_:b%s' % i, 'uri:name', Literal('anonymous'))
+    return graph
+
+def mainCanonical():
+    print
+    print "%-30s %10s %10s" % ('', 'digest', 'diff')
+    for name, createGraph, size in [
+            ('rdf:List', listGraph, 600),
+            ('identical blank nodes', identicalBNodesGraph, 300),
+            ('identical blank nodes', identicalBNodesGraph, 1200),
+        ]:
+        graph, other = createGraph(size), createGraph(size)
+        other.addTriple('uri:record', 'uri:title', Literal('changed'))
+        print "%-30s %9.3fs %9.3fs" % ('%s (%s)' % (name, size), timed(graph.canonicalDigest), timed(graph.diff, other))
+
+def main(size):
+    triples = createTriples(size)
+    print "%s triples" % size
+    print "%-30s %10s %10s %10s" % ('', 'add', 'lookup', 'remove')
+    for name, createGraph, deferIndexing in [
+            ('powerset index (former)', PowersetIndexGraph, False),
+            ('Graph', Graph, False),
+            ('Graph with TermDictionary', lambda: Graph(termDictionary=TermDictionary()), False),
+            ('Graph, deferIndexing', Graph, True),
+        ]:
+        print "%-30s %9.3fs %9.3fs %9.3fs" % ((name,) + benchmark(createGraph, triples, deferIndexing=deferIndexing))
+
+if __name__ == '__main__':
+    size = int(argv[1]) if len(argv) > 1 else 200000
+    main(size)
+    mainConcurrent(size)
+    mainPatterns(2000)
+    mainCanonical()